@@ -1,7 +1,16 @@
-import sqlite3
+import os
 from pathlib import Path
 
-DB_FILEPATH = Path(__file__).parent / "data" / "trivia_league.db"
+from classes.connection_manager import ConnectionManager
+from config import CONNECTION_CONFIG
 
-CONN = sqlite3.connect(DB_FILEPATH)
-CURSOR = CONN.cursor()
+# the database file and connection profile can be selected with environment
+# variables or reconfigured (e.g. from CLI flags) before the first query
+DB_FILEPATH = Path(
+    os.environ.get(
+        "TRIVIA_DB_PATH", Path(__file__).parent / "data" / "trivia_league.db"
+    )
+)
+DB_PROFILE = os.environ.get("TRIVIA_DB_PROFILE", CONNECTION_CONFIG["default_profile"])
+
+DB = ConnectionManager(DB_FILEPATH, DB_PROFILE, CONNECTION_CONFIG["profiles"])
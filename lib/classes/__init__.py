@@ -1 +1,4 @@
 from .step_context import StepContext
+from .identity_map import IdentityMap
+from .connection_manager import ConnectionManager
+from .menu import Menu
@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ConnectionManager:
+    """
+    Owns the application's SQLite connection. The connection is not opened
+    until it is first used, and it is opened with the PRAGMA settings of the
+    selected profile from the connection config. The database path and the
+    profile can be changed with configure() until then (or after close()).
+    Every thread gets its own connection, so worker threads can query the
+    database at the same time as the main thread.
+    """
+
+    def __init__(self, db_path: Path, profile: str, profiles: dict):
+        self.profiles = profiles
+        self.db_path = Path(db_path)
+        self.profile = profile
+        # per-thread connection and cursor; configure() bumps the generation
+        # so that connections opened with the old settings are reopened
+        self._local = threading.local()
+        self._generation = 0
+
+    def __repr__(self):
+        state = "open" if self.is_open else "closed"
+        return f"<<CONNECTION: {self.db_path} ({self.profile}, {state})>>"
+
+    @property
+    def profile(self):
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile):
+        if profile not in self.profiles:
+            options = " or ".join(f"'{name}'" for name in self.profiles)
+            raise ValueError(f"Unknown profile '{profile}'. Expected {options}.")
+        self._profile = profile
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            getattr(self._local, "connection", None) is not None
+            and self._local.generation == self._generation
+        )
+
+    @property
+    def is_read_only(self) -> bool:
+        return bool(self.profiles[self.profile].get("read_only"))
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self.is_open:
+            self.open()
+        return self._local.connection
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        if not self.is_open:
+            self.open()
+        return self._local.cursor
+
+    def configure(self, db_path: Path = None, profile: str = None):
+        """
+        Selects a different database file and/or profile, closing the
+        calling thread's connection (if any) so that the next use reopens with
+        the new settings. Other threads reopen their connections the next time
+        they use them.
+        """
+        self.close()
+        self._generation += 1
+        if db_path is not None:
+            self.db_path = Path(db_path)
+        if profile is not None:
+            self.profile = profile
+
+    def open(self):
+        """
+        Opens the calling thread's connection for the configured path and
+        applies the profile's PRAGMA settings. Read-only profiles open the
+        file in read-only mode.
+        """
+        self.close()
+        profile_config = self.profiles[self.profile]
+        if profile_config.get("read_only"):
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True)
+        else:
+            connection = sqlite3.connect(self.db_path)
+
+        for pragma, value in profile_config.get("pragmas", {}).items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+
+        self._local.connection = connection
+        self._local.cursor = connection.cursor()
+        self._local.generation = self._generation
+
+    def close(self):
+        """
+        Commits any pending changes and closes the calling thread's
+        connection if it is open.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return
+        connection.commit()
+        connection.close()
+        self._local.connection = None
+        self._local.cursor = None
+
+    def pragma_settings(self) -> dict:
+        """
+        Returns the live value of every PRAGMA set by the current profile.
+        """
+        return {
+            pragma: self.connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in self.profiles[self.profile].get("pragmas", {})
+        }
@@ -0,0 +1,103 @@
+import threading
+import weakref
+
+
+class IdentityMap:
+    """
+    Session-wide registry of loaded model instances keyed by (model, id) so
+    that every read of the same database row yields the same object. In weak
+    mode, instances are dropped from the map as soon as nothing else in the
+    session references them. The map can be shared by several threads.
+    """
+
+    def __init__(self, weak: bool = False):
+        self.weak = weak
+        self._instances = self._new_store(weak)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __contains__(self, key: tuple):
+        return key in self._instances
+
+    @staticmethod
+    def _new_store(weak: bool):
+        return weakref.WeakValueDictionary() if weak else {}
+
+    def get(self, model: type, id: int):
+        """
+        Returns the instance of model registered under id or None if the
+        row has not been loaded (or has since been collected or evicted).
+        """
+        with self._lock:
+            return self._instances.get((model, id))
+
+    def add(self, instance: object):
+        """
+        Registers a saved instance under its model and id, replacing any
+        instance previously registered under the same key.
+        """
+        if instance.id is not None:
+            with self._lock:
+                self._instances[(type(instance), instance.id)] = instance
+        return instance
+
+    def setdefault(self, instance: object):
+        """
+        Returns the instance already registered under the provided
+        instance's model and id, or registers and returns the provided
+        instance if there is none. Threads that load the same row at the same
+        time therefore all end up with the same instance.
+        """
+        if instance.id is None:
+            return instance
+        key = (type(instance), instance.id)
+        with self._lock:
+            existing = self._instances.get(key)
+            if existing is not None:
+                return existing
+            self._instances[key] = instance
+            return instance
+
+    def evict(self, instance: object):
+        """
+        Removes the provided instance from the map if it is the instance
+        registered under its model and id.
+        """
+        key = (type(instance), instance.id)
+        with self._lock:
+            if self._instances.get(key) is instance:
+                del self._instances[key]
+
+    def evict_id(self, model: type, id: int):
+        """
+        Removes whatever instance is registered under model and id.
+        """
+        with self._lock:
+            self._instances.pop((model, id), None)
+
+    def clear(self, model: type = None):
+        """
+        Removes every instance of the provided model from the map, or every
+        instance of every model if no model is provided.
+        """
+        with self._lock:
+            if model is None:
+                self._instances.clear()
+                return
+            for key in [key for key in self._instances.keys() if key[0] is model]:
+                self._instances.pop(key, None)
+
+    def set_weak(self, weak: bool):
+        """
+        Switches between strong and weak references, carrying over the
+        instances that are currently registered.
+        """
+        with self._lock:
+            if weak == self.weak:
+                return
+            store = self._new_store(weak)
+            store.update(self._instances.items())
+            self.weak = weak
+            self._instances = store
@@ -0,0 +1,37 @@
+class Menu:
+    """
+    A menu screen's options, indexed for constant-time lookup. menu_options
+    are (selector, menu text, value) tuples selected by number; nav_options
+    are (selector, menu text, op, format) tuples selected by letter. Menus
+    that do not change between screens (e.g. the operation menu) are built
+    once and reused, including their rendered lines.
+    """
+
+    def __init__(self, menu_options: tuple, nav_options: tuple):
+        self.menu_options = tuple(menu_options)
+        self.nav_options = tuple(nav_options)
+        # selectors are matched case-insensitively
+        self.options = {option[0].lower(): option for option in self.menu_options}
+        self.nav = {option[0].lower(): option for option in self.nav_options}
+        # set by render_menu() the first time the menu is shown
+        self.lines = None
+
+    def __len__(self):
+        return len(self.menu_options)
+
+    def __contains__(self, selector: str) -> bool:
+        selector = selector.lower()
+        return selector in self.options or selector in self.nav
+
+    def get_option(self, selector: str) -> tuple:
+        """
+        Returns the menu option selected by selector, or None if selector is
+        not a menu option selector (it may still be a nav option selector).
+        """
+        return self.options.get(selector.lower())
+
+    def get_nav_option(self, selector: str) -> tuple:
+        """
+        Returns the nav option selected by selector, or None.
+        """
+        return self.nav.get(selector.lower())
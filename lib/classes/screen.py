@@ -0,0 +1,127 @@
+import os
+import re
+import shutil
+import sys
+
+# cursor home, clear screen and clear scrollback (what 'clear' prints)
+CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+CLEAR_TO_LINE_END = "\x1b[K"
+CLEAR_TO_SCREEN_END = "\x1b[J"
+ESCAPE_SEQUENCE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def move_to_row(row: int) -> str:
+    return f"\x1b[{row};1H"
+
+
+def visible_length(line: str) -> int:
+    return len(ESCAPE_SEQUENCE.sub("", line))
+
+
+class Screen:
+    """
+    Composes each CLI screen as a frame of lines and writes it to the
+    terminal in a single write, clearing with ANSI escape sequences instead
+    of running a 'clear' subprocess. When the previous frame is still on the
+    terminal, only the lines that changed are rewritten. Prompts and messages
+    written below the frame with write_line() and input() are cleared by the
+    next frame.
+    """
+
+    def __init__(self, stream=None, diff: bool = None):
+        self.stream = stream or sys.stdout
+        # redrawing changed lines needs a terminal that honours cursor moves
+        self.diff = self.stream.isatty() if diff is None else diff
+        self._frame = None
+        self._previous = None
+        self._rows_below = 0
+        if os.name == "nt":
+            # enables ANSI escape sequences in the Windows console
+            os.system("")
+
+    def clear(self):
+        """
+        Clears the terminal now, e.g. before a confirmation prompt.
+        """
+        self.render()
+        self._write(CLEAR_SCREEN)
+        self._previous = None
+        self._rows_below = 0
+
+    def start_frame(self):
+        """
+        Starts composing a new frame, replacing any frame not yet rendered.
+        """
+        self._frame = []
+
+    def add(self, *texts: str):
+        """
+        Adds lines to the frame being composed; a text containing newlines
+        adds one line per newline-separated part, like print() would.
+        """
+        if self._frame is None:
+            self.start_frame()
+        for text in texts:
+            self._frame.extend(str(text).split("\n"))
+
+    def render(self):
+        """
+        Writes the frame being composed (if any) in one write. Only the lines
+        that differ from the previous frame are rewritten when the previous
+        frame is known to still be on screen; otherwise the screen is cleared
+        and the whole frame is written.
+        """
+        if self._frame is None:
+            return
+        lines, self._frame = self._frame, None
+
+        if self._can_redraw_changes(lines):
+            previous = self._previous
+            changed = [
+                f"{move_to_row(row)}{line}{CLEAR_TO_LINE_END}"
+                for row, line in enumerate(lines, start=1)
+                if row > len(previous) or previous[row - 1] != line
+            ]
+            output = "".join(changed) + move_to_row(len(lines) + 1)
+            output += CLEAR_TO_SCREEN_END
+        else:
+            output = CLEAR_SCREEN + "\n".join(lines) + "\n"
+
+        self._write(output)
+        self._previous = lines
+        self._rows_below = 0
+
+    def write_line(self, text: str = ""):
+        """
+        Writes text and a newline below the rendered frame, rendering the
+        pending frame first.
+        """
+        self.render()
+        self._rows_below += str(text).count("\n") + 1
+        self._write(f"{text}\n")
+
+    def input(self, prompt: str = "") -> str:
+        """
+        Renders the pending frame and reads a line of user input.
+        """
+        self.render()
+        # the prompt's lines and the newline echoed when Enter is pressed
+        self._rows_below += prompt.count("\n") + 1
+        return input(prompt)
+
+    def _can_redraw_changes(self, lines: list) -> bool:
+        """
+        Changed lines can only be redrawn in place if the previous frame has
+        not scrolled off the top of the terminal and no line of either frame
+        wraps, so that frame lines and terminal rows still line up.
+        """
+        if not self.diff or self._previous is None:
+            return False
+        columns, rows = shutil.get_terminal_size()
+        if len(self._previous) + self._rows_below >= rows or len(lines) >= rows:
+            return False
+        return all(visible_length(line) < columns for line in (*self._previous, *lines))
+
+    def _write(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
@@ -1,14 +1,100 @@
+import sys
+from collections import namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
+
+DEFAULT_HISTORY_DEPTH = 50
+
+StepMemory = namedtuple("StepMemory", ("step", "total_bytes", "own_bytes"))
+
+
+def freeze(value):
+    """
+    Returns an immutable version of a state value: lists become tuples and
+    dicts become read-only mappings. Other values are stored as they are.
+    """
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(dict(value))
+    return value
+
+
+def deep_size(value, seen: set) -> int:
+    """
+    Returns the memory used by value and the objects it holds (container
+    items and instance attributes), leaving out objects in seen and adding
+    every object counted to seen.
+    """
+    if id(value) in seen or isinstance(value, type) or callable(value):
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, State):
+        value = value._data
+        size += sys.getsizeof(value)
+    if isinstance(value, (Mapping, MappingProxyType)):
+        size += sum(
+            deep_size(key, seen) + deep_size(item, seen) for key, item in value.items()
+        )
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    return size
+
+
+class State(Mapping):
+    """
+    An immutable snapshot of the CLI state. set() returns a new snapshot that
+    shares every unchanged value with this one, so a step's history entry is
+    never changed by the steps after it and pushing a step copies nothing.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping = ()):
+        self._data = {key: freeze(value) for key, value in dict(data).items()}
+
+    def __getitem__(self, key: str):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<<STATE: {self._data!r}>>"
+
+    def set(self, **changes) -> "State":
+        state = State.__new__(State)
+        state._data = {**self._data, **{k: freeze(v) for k, v in changes.items()}}
+        return state
+
+
 class StepContext:
-    def __init__(self, first_step_func, init_state):
+    def __init__(
+        self,
+        first_step_func,
+        init_state,
+        history_depth: int = DEFAULT_HISTORY_DEPTH,
+    ):
+        if history_depth < 2:
+            raise ValueError("history_depth must be at least 2")
         self.first_step_func = first_step_func
-        self.init_state = init_state
-        self.state = init_state.copy()
-        self.stack = [(self.first_step_func, init_state.copy())]
+        self.init_state = State(init_state)
+        self.history_depth = history_depth
+        self.state = self.init_state
+        self.stack = [(self.first_step_func, self.init_state)]
 
     def push(self, step_func):
-        # Push the function and a copy of the current state
-        state_snapshot = self.state.copy()
-        self.stack.append((step_func, state_snapshot))
+        # states are immutable, so the step shares the current state
+        self.stack.append((step_func, self.state))
+        # the first step is always kept so that going back can reach it
+        if len(self.stack) > self.history_depth:
+            del self.stack[1]
 
     def pop(self):
         if self.stack:
@@ -16,10 +102,48 @@ class StepContext:
         else:
             return None
 
+    def update(self, **changes):
+        """
+        Replaces the current state with a copy holding the changes. The copy
+        also becomes the state of the step at the top of the stack, so that
+        a step redrawn after paging or filtering keeps its changes.
+        """
+        self.state = self.state.set(**changes)
+        if self.stack:
+            self.stack[-1] = (self.stack[-1][0], self.state)
+
     def can_go_back(self, step_count: int = 1):
         return len(self.stack) > step_count - 1
 
     def restart(self):
-        self.state = self.init_state.copy()
+        self.state = self.init_state
         self.stack.clear()
         self.push(self.first_step_func)
+
+    def memory_report(self) -> tuple:
+        """
+        Returns a StepMemory for every step in the stack, from the first one:
+        the memory its state uses and the part of it not shared with the
+        states of the steps below it.
+        """
+        report = []
+        seen = set()
+        for step_func, state in self.stack:
+            total = deep_size(state, set())
+            own = deep_size(state, seen)
+            report.append(StepMemory(step_func.__name__, total, own))
+        return tuple(report)
+
+    def memory_summary(self) -> str:
+        """
+        Summarizes memory_report(), e.g. 'History: 2 steps, 9.1 KiB
+        (select_team 8.0 KiB, select_operation +1.1 KiB)'.
+        """
+        report = self.memory_report()
+        steps = ", ".join(
+            f"{step} {'+' if index else ''}{own / 1024:.1f} KiB"
+            for index, (step, _, own) in enumerate(report)
+        )
+        total = sum(own for *_, own in report) / 1024
+        count = f"{len(report)} step{'s' if len(report) != 1 else ''}"
+        return f"History: {count}, {total:.1f} KiB ({steps})"
@@ -1,17 +1,25 @@
 import sys
+from contextlib import ExitStack
 from pathlib import Path
+from sqlite3 import IntegrityError
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
-from classes import StepContext
+from __init__ import DB
+from classes import Menu, StepContext
 from models import Participant, Team
-from modules import process_menu_response, get_attr_value
+from modules import process_menu_response, get_attr_value, run_batch, PrefixFilter
 from config import (
     MENU_OPS_CONFIG,
-    NAV_OPS_CONFIG,
     OPS_CONFIG,
+    CONNECTION_CONFIG,
 )
-from strings.display_messages import EXIT_MSG
+from strings.display_messages import APP_TITLE, EXIT_MSG
+from util.db_helpers import transaction
+from util.errors import StaleRowError, TeamFullError
+from util.instrumentation import INSTRUMENTATION, begin_screen, set_instrumentation
 from util.helpers import (
     generate_disp_text,
     fmt_participant_name,
@@ -19,13 +27,21 @@ from util.helpers import (
     render_menu,
     render_result,
     fetch_teams,
+    build_nav_options,
+    turn_page,
+    apply_filter,
+    fmt_filter_instruction,
     get_user_confirmation,
     clear_cli,
     back_to_op_select,
     resolve_sentinel,
+    DEBUG_NOTES,
 )
 from util.warnings import (
     warn_invalid_option,
+    warn_team_name_taken,
+    warn_team_full,
+    warn_stale_data,
 )
 
 # navigation sentinals
@@ -33,31 +49,80 @@ from util.warnings import (
 USER_BACK = object()
 USER_RESET = object()
 USER_QUIT = object()
+USER_NEXT = object()
+USER_PREV = object()
 
 sentinels = {
     "back": USER_BACK,
     "reset": USER_RESET,
     "quit": USER_QUIT,
+    "next": USER_NEXT,
+    "prev": USER_PREV,
 }
 
 # sort keys for participant and team lists
 
-participant_sort = lambda p: (p.l_name, p.f_name)
-team_sort = lambda t: t.name
+participant_sort = lambda p: (p.l_name.lower(), p.f_name.lower(), p.id)
+team_sort = lambda t: (t.name.lower(), t.id)
+
+
+# state lists are tuples, so changes build new (sorted) tuples
+
+
+def with_item(items: tuple, item: object, sort_key: callable) -> tuple:
+    return tuple(sorted((*items, item), key=sort_key))
+
+
+def without_item(items: tuple, item: object) -> tuple:
+    return tuple(i for i in items if i is not item)
+
+
+# another session saved first: warn and reload everything from the team menu
+
+
+def resolve_conflict(context, error):
+    if isinstance(error, TeamFullError):
+        warn_team_full(enter_to_continue=True)
+    else:
+        warn_stale_data()
+    return context.restart()
+
+
+# the operation menu is the same for every team, so it is built (and
+# formatted) once
+
+OPERATION_MENU = Menu(
+    (
+        (str(index), attrs.get("menu_text"), op)
+        for index, (op, attrs) in enumerate(OPS_CONFIG.items())
+        if op != "create_team"
+    ),
+    build_nav_options(),
+)
 
 
 # menu operations
 
 
 def select_team(context):
-    context.state["comp_teams"], context.state["free_team"] = fetch_teams()
+    team_page, free_team = fetch_teams(
+        MENU_OPS_CONFIG["team"].get("page_size"),
+        context.state["team_cursor"],
+        context.state["team_filter"],
+    )
+    teams = [item.team for item in team_page.items]
+    counts = {item.team.id: item.participant_count for item in team_page.items}
+    context.update(free_team=free_team, comp_teams=teams)
     render_header(
         MENU_OPS_CONFIG["team"].get("title_suffix"),
-        MENU_OPS_CONFIG["team"].get("instruction"),
+        fmt_filter_instruction(
+            MENU_OPS_CONFIG["team"].get("instruction"), context.state["team_filter"]
+        ),
         ctrl_c_cancel=False,
     )
-    # create a list of tuples containing team names and objects
-    team_options = [(t.name, t) for t in context.state["comp_teams"]]
+    # create a list of tuples containing team names with fill levels and objects
+    max_size = Team.CONFIG["max_team_participants"]
+    team_options = [(f"{t.name} ({counts[t.id]}/{max_size})", t) for t in teams]
     # extend menu_options with the create team operation
     all_options = team_options + list(
         (attrs.get("menu_text"), op)
@@ -68,21 +133,27 @@ def select_team(context):
     menu_options = tuple(
         (str(index), tup[0], tup[1]) for index, tup in enumerate(all_options, start=1)
     )
-    # generate the quit nav option
-    quit_opt = NAV_OPS_CONFIG.get("quit")
-    quit_text = quit_opt.get("menu_text")
-    # tuple inside a tuple because this is a collection of options with a length of 1
-    nav_options = tuple(((quit_text[0], quit_text, "quit", quit_opt.get("format")),))
-    render_menu(menu_options, nav_options)
-    response = process_menu_response(menu_options, nav_options, **sentinels)
+    # generate the paging and quit nav options
+    menu = Menu(menu_options, build_nav_options(team_page, exclude=("back", "reset")))
+    render_menu(menu)
+    response = process_menu_response(menu, allow_filter=True, **sentinels)
+
+    if isinstance(response, PrefixFilter):
+        return apply_filter(context, "team_filter", "team_cursor", response.prefix)
+
+    if response is USER_NEXT or response is USER_PREV:
+        return turn_page(context, "team_cursor", teams, response is USER_NEXT)
 
     if response in sentinels.values():
         return resolve_sentinel(response, context, **sentinels)
 
     elif isinstance(response, Team):
-        context.state["team"] = response
-        context.state["team_name"] = generate_disp_text(response)
-        context.state["team_roster"] = Participant.fetch(context.state["team"].id)
+        context.update(
+            team=response,
+            team_name=generate_disp_text(response),
+            team_roster=Participant.fetch(response.id),
+            participant_count=counts[response.id],
+        )
         context.push(select_operation)
 
     elif isinstance(response, str):
@@ -101,27 +172,17 @@ def select_operation(context):
         team_roster=context.state["team_roster"],
         ctrl_c_cancel=False,
     )
-    menu_options = tuple(
-        (str(index), attrs.get("menu_text"), op)
-        for index, (op, attrs) in enumerate(OPS_CONFIG.items())
-        if op != "create_team"
-    )
-    nav_options = tuple(
-        (op[0], attrs.get("menu_text"), op, attrs.get("format"))
-        for op, attrs in NAV_OPS_CONFIG.items()
-    )
-    render_menu(menu_options, nav_options)
+    render_menu(OPERATION_MENU)
     response = process_menu_response(
-        menu_options,
-        nav_options,
+        OPERATION_MENU,
         context.state["team"],
-        len(context.state["team_roster"]),
+        context.state["participant_count"],
         **sentinels,
     )
     if response in sentinels.values():
         return resolve_sentinel(response, context, **sentinels)
 
-    context.state["operation"] = response
+    context.update(operation=response)
     next_step_func = (
         select_participant
         if OPS_CONFIG[response].get("resolve_participant")
@@ -134,35 +195,52 @@ def select_participant(context):
     need_free_agents = OPS_CONFIG[context.state["operation"]]["load_free_agents"]
     render_header(
         OPS_CONFIG[context.state["operation"]].get("title_suffix"),
-        MENU_OPS_CONFIG["participant"].get("instruction"),
+        fmt_filter_instruction(
+            MENU_OPS_CONFIG["participant"].get("instruction"),
+            context.state["participant_filter"],
+        ),
         team_name=context.state["team_name"],
         team_roster=context.state["team_roster"] if need_free_agents else None,
         ctrl_c_cancel=False,
     )
+    # only the visible page of the free agents or the roster is fetched
+    list_team = (
+        context.state["free_team"] if need_free_agents else context.state["team"]
+    )
+    participant_page = Participant.fetch_page(
+        list_team.id,
+        MENU_OPS_CONFIG["participant"].get("page_size"),
+        prefix=context.state["participant_filter"],
+        **(context.state["participant_cursor"] or {}),
+    )
     if need_free_agents:
-        context.state["free_agents"] = context.state["free_team"].fetch_participants()
+        context.update(free_agents=participant_page.items)
 
-    participant_list = (
-        context.state["free_agents"]
-        if need_free_agents
-        else context.state["team_roster"]
-    )
     menu_options = tuple(
         (str(index), fmt_participant_name(p.f_name, p.l_name), p)
-        for index, p in enumerate(participant_list, start=1)
+        for index, p in enumerate(participant_page.items, start=1)
     )
-    nav_options = tuple(
-        (op[0], attrs.get("menu_text"), op, attrs.get("format"))
-        for op, attrs in NAV_OPS_CONFIG.items()
-    )
-    render_menu(menu_options, nav_options)
-    response = process_menu_response(menu_options, nav_options, **sentinels)
+    menu = Menu(menu_options, build_nav_options(participant_page))
+    render_menu(menu)
+    response = process_menu_response(menu, allow_filter=True, **sentinels)
+
+    if isinstance(response, PrefixFilter):
+        return apply_filter(
+            context, "participant_filter", "participant_cursor", response.prefix
+        )
+
+    if response is USER_NEXT or response is USER_PREV:
+        return turn_page(
+            context,
+            "participant_cursor",
+            participant_page.items,
+            response is USER_NEXT,
+        )
 
     if response in sentinels.values():
         return resolve_sentinel(response, context, **sentinels)
 
-    context.state["participant"] = response
-    context.state["participant_name"] = generate_disp_text(response)
+    context.update(participant=response, participant_name=generate_disp_text(response))
     op_func = globals().get(context.state["operation"])
     context.push(op_func)
 
@@ -186,12 +264,18 @@ def create_team(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        new_team.save()
-        context.state["team"] = new_team
-        context.state["team_name"] = generate_disp_text(new_team)
-        context.state["comp_teams"].append(new_team)
-        context.state["comp_teams"].sort(key=team_sort)
-        context.state["team_roster"] = []
+        try:
+            new_team.save()
+        except IntegrityError:
+            warn_team_name_taken()
+            return context.restart()
+        context.update(
+            team=new_team,
+            team_name=generate_disp_text(new_team),
+            comp_teams=with_item(context.state["comp_teams"], new_team, team_sort),
+            team_roster=(),
+            participant_count=0,
+        )
 
     success_msg = f"{context.state['team_name']} : {op_config.get('success_msg')}"
 
@@ -228,14 +312,18 @@ def create_participant(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        context.state["participant"] = new_participant
-        setattr(context.state["participant"], "team_id", context.state["team"].id)
-        new_participant.save()
-        context.state["participant_name"] = generate_disp_text(
-            context.state["participant"]
+        try:
+            context.state["team"].add_participant(new_participant)
+        except (StaleRowError, TeamFullError) as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant=new_participant,
+            participant_name=generate_disp_text(new_participant),
+            participant_count=context.state["participant_count"] + 1,
+            team_roster=with_item(
+                context.state["team_roster"], new_participant, participant_sort
+            ),
         )
-        context.state["team_roster"].append(context.state["participant"])
-        context.state["team_roster"].sort(key=participant_sort)
 
     success_msg = (
         f"{context.state['participant_name']} : {op_config.get('success_msg')}"
@@ -253,10 +341,18 @@ def recruit_free_agent(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        setattr(context.state["participant"], "team_id", context.state["team"].id)
-        context.state["participant"].update()
-        context.state["team_roster"].append(context.state["participant"])
-        context.state["team_roster"].sort(key=participant_sort)
+        try:
+            context.state["team"].add_participant(context.state["participant"])
+        except (StaleRowError, TeamFullError) as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant_count=context.state["participant_count"] + 1,
+            team_roster=with_item(
+                context.state["team_roster"],
+                context.state["participant"],
+                participant_sort,
+            ),
+        )
 
     success_msg = f"{context.state['participant_name']} : {OPS_CONFIG['recruit_free_agent'].get('success_msg')}"
 
@@ -272,9 +368,16 @@ def remove_participant(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        setattr(context.state["participant"], "team_id", context.state["free_team"].id)
-        context.state["participant"].update()
-        context.state["team_roster"].remove(context.state["participant"])
+        try:
+            context.state["free_team"].add_participant(context.state["participant"])
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant_count=context.state["participant_count"] - 1,
+            team_roster=without_item(
+                context.state["team_roster"], context.state["participant"]
+            ),
+        )
 
     success_msg = f"{context.state['participant_name']} : {OPS_CONFIG['remove_participant'].get('success_msg')}"
 
@@ -291,15 +394,21 @@ def del_team(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        # assign all participants to the free agent team
-        for p in context.state["team_roster"]:
-            setattr(p, "team_id", context.state["free_team"].id)
-            p.update()
-        context.state["comp_teams"].remove(context.state["team"])
-        context.state["team"].delete()
-        context.state["team"] = None
-        context.state["team_name"] = None
-        context.state["team_roster"].clear()
+        # assign all participants to the free agent team and delete the team in
+        # a single transaction
+        try:
+            with transaction():
+                context.state["team"].release_participants(context.state["free_team"])
+                context.state["team"].delete()
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            comp_teams=without_item(context.state["comp_teams"], context.state["team"]),
+            team=None,
+            team_name=None,
+            team_roster=(),
+            participant_count=0,
+        )
 
     render_result(success_msg, is_confirmed)
     if is_confirmed:
@@ -315,10 +424,18 @@ def del_participant(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
-        context.state["team_roster"].remove(context.state["participant"])
-        context.state["participant"].delete()
-        context.state["participant"] = None
-        context.state["participant_name"] = None
+        try:
+            context.state["participant"].delete()
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant_count=context.state["participant_count"] - 1,
+            team_roster=without_item(
+                context.state["team_roster"], context.state["participant"]
+            ),
+            participant=None,
+            participant_name=None,
+        )
 
     render_result(success_msg, is_confirmed)
     back_to_op_select(context, select_team, select_operation)
@@ -346,11 +463,16 @@ def upd_participant_f_name(context):
 
     if is_confirmed := get_user_confirmation(save_prompt):
         setattr(context.state["participant"], "f_name", response)
-        context.state["participant"].update()
-        context.state["participant_name"] = generate_disp_text(
-            context.state["participant"]
+        try:
+            context.state["participant"].update()
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant_name=generate_disp_text(context.state["participant"]),
+            team_roster=tuple(
+                sorted(context.state["team_roster"], key=participant_sort)
+            ),
         )
-        context.state["team_roster"].sort(key=participant_sort)
 
     success_msg = (
         f"{context.state['participant_name']} : {op_config.get('success_msg')}"
@@ -380,11 +502,16 @@ def upd_participant_l_name(context):
 
     if is_confirmed := get_user_confirmation(save_prompt):
         setattr(context.state["participant"], "l_name", resonse)
-        context.state["participant"].update()
-        context.state["participant_name"] = generate_disp_text(
-            context.state["participant"]
+        try:
+            context.state["participant"].update()
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            participant_name=generate_disp_text(context.state["participant"]),
+            team_roster=tuple(
+                sorted(context.state["team_roster"], key=participant_sort)
+            ),
         )
-        context.state["team_roster"].sort(key=participant_sort)
 
     success_msg = (
         f"{context.state['participant_name']} : {op_config.get('success_msg')}"
@@ -412,10 +539,20 @@ def upd_team_name(context):
     clear_cli()
 
     if is_confirmed := get_user_confirmation(save_prompt):
+        previous_name = context.state["team"].name
         setattr(context.state["team"], "name", response)
-        context.state["team"].update()
-        context.state["team_name"] = generate_disp_text(context.state["team"])
-        context.state["comp_teams"].sort(key=team_sort)
+        try:
+            context.state["team"].update()
+        except IntegrityError:
+            setattr(context.state["team"], "name", previous_name)
+            warn_team_name_taken()
+            return back_to_op_select(context, select_team, select_operation)
+        except StaleRowError as error:
+            return resolve_conflict(context, error)
+        context.update(
+            team_name=generate_disp_text(context.state["team"]),
+            comp_teams=tuple(sorted(context.state["comp_teams"], key=team_sort)),
+        )
 
     success_msg = f"{context.state['team_name']} : {op_config.get('success_msg')}"
 
@@ -432,15 +569,25 @@ initial_state = {
     "participant": None,
     "participant_name": None,
     "comp_teams": None,
+    "team_cursor": None,
+    "team_filter": None,
     "free_team": None,
     "team_roster": None,
+    "participant_count": None,
     "free_agents": None,
+    "participant_cursor": None,
+    "participant_filter": None,
     "save_prompt": None,
     "success_msg": None,
     "exec_func": None,
 }
 
-context = StepContext(select_team, initial_state)
+context = StepContext(
+    select_team, initial_state, MENU_OPS_CONFIG["history"].get("depth")
+)
+
+# --debug-state shows the memory used by the step history on every screen
+STATE_DEBUG = {"enabled": False}
 
 
 # control flow
@@ -451,12 +598,121 @@ def main():
         step_func = context.stack[-1][0]
         step_state = context.stack[-1][1]
         context.state = step_state
+        if INSTRUMENTATION["enabled"]:
+            begin_screen()
+        if STATE_DEBUG["enabled"]:
+            DEBUG_NOTES["history"] = context.memory_summary()
         step_func(context)
 
     print(f"\n{generate_disp_text(EXIT_MSG, 'title')}\n")
     exit()
 
 
+def batch_main(args) -> int:
+    """
+    Runs the --batch operations file and returns the exit status: 0 if every
+    record was applied, 1 if any failed and 2 if the database is read-only
+    or the operations or log file cannot be opened.
+    """
+    if DB.is_read_only:
+        print("--batch needs a writable database.", file=sys.stderr)
+        return 2
+    with ExitStack() as files:
+        try:
+            ops_file = (
+                sys.stdin
+                if args.batch == "-"
+                else files.enter_context(open(args.batch, encoding="utf-8"))
+            )
+            log_file = (
+                files.enter_context(open(args.batch_log, "w", encoding="utf-8"))
+                if args.batch_log
+                else sys.stdout
+            )
+        except OSError as error:
+            print(f"Cannot open {error.filename}: {error.strerror}.", file=sys.stderr)
+            return 2
+        failed = run_batch(ops_file, log_file, args.batch_size)
+    return 1 if failed else 0
+
+
+def parse_args():
+    # only needed when run as a script
+    import argparse
+
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="path to the league database (default: $TRIVIA_DB_PATH or the bundled database)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=CONNECTION_CONFIG["profiles"].keys(),
+        default=None,
+        help="connection profile (default: $TRIVIA_DB_PROFILE or 'interactive')",
+    )
+    parser.add_argument(
+        "--debug-sql",
+        action="store_true",
+        help="record every SQL statement and show per-screen query counts",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="with --debug-sql, check query plans and flag full-table scans",
+    )
+    parser.add_argument(
+        "--slow-query-ms",
+        type=float,
+        default=None,
+        help="log statements slower than this to the slow query log",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="OPS_FILE",
+        default=None,
+        help="apply the operation records in a JSONL file ('-' for stdin) without prompts",
+    )
+    parser.add_argument(
+        "--batch-log",
+        metavar="LOG_FILE",
+        default=None,
+        help="with --batch, write the per-line results here (default: stdout)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=CONNECTION_CONFIG["batch_size"],
+        help="with --batch, number of records committed per transaction",
+    )
+    parser.add_argument(
+        "--debug-state",
+        action="store_true",
+        help="show the memory used by the step history on every screen",
+    )
+    return parser.parse_args()
+
+
 # entry point for the CLI
 if __name__ == "__main__":
+    args = parse_args()
+    DB.configure(args.db, args.profile)
+    if DB.is_read_only:
+        # every operation writes to the league, so the CLI cannot run on a
+        # read-only connection
+        print(
+            "The CLI needs a writable database; choose a writable --profile.",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    if args.debug_sql or args.explain or args.slow_query_ms is not None:
+        set_instrumentation(True, args.explain, args.slow_query_ms)
+    STATE_DEBUG["enabled"] = args.debug_state
+    # bring databases created by older versions up to the current schema
+    Team.build_table()
+    Participant.build_table()
+    if args.batch:
+        sys.exit(batch_main(args))
     main()
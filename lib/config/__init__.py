@@ -1,10 +1,14 @@
-from .json_to_python import (
-    NAV_OPS_CONFIG,
-    MENU_OPS_CONFIG,
-    OPS_CONFIG,
-    TEAM_TABLE_CONFIG,
-    PARTICIPANT_TABLE_CONFIG,
-    TEAM_MODEL_CONFIG,
-    PARTICIPANT_MODEL_CONFIG,
-    TEXT_COLOR_MAP,
-)
+from .json_to_python import CONFIG_FILES, load_section, load_all
+
+
+def __getattr__(name: str):
+    # sections are loaded from the config snapshot the first time they are
+    # imported and then kept as module attributes
+    if name not in CONFIG_FILES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = load_section(name)
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(CONFIG_FILES))
@@ -1,49 +1,100 @@
 import os
 import json
+import marshal
 
 script_dir = os.path.dirname(__file__)
 
-# open navigation operation config file for reading
-nav_path = os.path.join(script_dir, "navigation", "config.json")
-with open(nav_path, "r", encoding="utf-8") as nav:
-    NAV_OPS_CONFIG = json.load(nav)
-
-
-# open menu operation config file for reading
-menu_path = os.path.join(script_dir, "menu", "config.json")
-with open(menu_path, "r", encoding="utf-8") as menu:
-    MENU_OPS_CONFIG = json.load(menu)
-
-
-# open primary operations config file for reading
-op_path = os.path.join(script_dir, "operation", "config.json")
-with open(op_path, "r", encoding="utf-8") as ops:
-    OPS_CONFIG = json.load(ops)
-
-
-# open database config files for reading
-db_team_path = os.path.join(script_dir, "database", "team", "config.json")
-with open(db_team_path, "r", encoding="utf-8") as team_table:
-    TEAM_TABLE_CONFIG = json.load(team_table)
-
-
-db_participant_path = os.path.join(script_dir, "database", "participant", "config.json")
-with open(db_participant_path, "r", encoding="utf-8") as participant_table:
-    PARTICIPANT_TABLE_CONFIG = json.load(participant_table)
-
-
-# open model config files for reading
-model_team_path = os.path.join(script_dir, "model", "team", "config.json")
-with open(model_team_path, "r", encoding="utf-8") as team_model:
-    TEAM_MODEL_CONFIG = json.load(team_model)
-
-
-model_participant_path = os.path.join(script_dir, "model", "participant", "config.json")
-with open(model_participant_path, "r", encoding="utf-8") as participant_model:
-    PARTICIPANT_MODEL_CONFIG = json.load(participant_model)
-
-
-# open text color map config file for reading
-col_map_path = os.path.join(script_dir, "text_color_map.json")
-with open(col_map_path, "r", encoding="utf-8") as col_map:
-    TEXT_COLOR_MAP = json.load(col_map)
+# config sections and the JSON files they are read from
+CONFIG_FILES = {
+    "NAV_OPS_CONFIG": ("navigation", "config.json"),
+    "MENU_OPS_CONFIG": ("menu", "config.json"),
+    "OPS_CONFIG": ("operation", "config.json"),
+    "TEAM_TABLE_CONFIG": ("database", "team", "config.json"),
+    "PARTICIPANT_TABLE_CONFIG": ("database", "participant", "config.json"),
+    "IMPORT_CHECKPOINT_TABLE_CONFIG": ("database", "import_checkpoint", "config.json"),
+    "TEAM_MODEL_CONFIG": ("model", "team", "config.json"),
+    "PARTICIPANT_MODEL_CONFIG": ("model", "participant", "config.json"),
+    "TEXT_COLOR_MAP": ("text_color_map.json",),
+    "CONNECTION_CONFIG": ("connection", "config.json"),
+}
+
+# every section is kept in one snapshot file as marshalled data next to the
+# mtime and size of the JSON file it was parsed from, so that a cold start
+# reads one file and only unmarshals the sections it uses
+SNAPSHOT_PATH = os.environ.get(
+    "TRIVIA_CONFIG_SNAPSHOT", os.path.join(script_dir, ".config_snapshot")
+)
+
+SNAPSHOT_STATE = {"sections": None, "dirty": False}
+
+
+def source_path(section: str) -> str:
+    return os.path.join(script_dir, *CONFIG_FILES[section])
+
+
+def source_stamp(section: str) -> tuple:
+    """
+    Returns the (mtime in ns, size) of a section's JSON file, which tells
+    whether the snapshot's copy of the section is still current.
+    """
+    stat = os.stat(source_path(section))
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_snapshot() -> dict:
+    """
+    Returns the snapshot's {section: (stamp, marshalled data)} entries, or an
+    empty dict if there is no readable snapshot.
+    """
+    if SNAPSHOT_STATE["sections"] is None:
+        try:
+            with open(SNAPSHOT_PATH, "rb") as snapshot:
+                SNAPSHOT_STATE["sections"] = marshal.load(snapshot)
+        except (OSError, EOFError, ValueError, TypeError):
+            SNAPSHOT_STATE["sections"] = {}
+    return SNAPSHOT_STATE["sections"]
+
+
+def write_snapshot():
+    """
+    Saves the snapshot if any section was re-read from its JSON file. The
+    snapshot is only a cache, so failing to write it (e.g. on a read-only
+    install) is ignored.
+    """
+    if not SNAPSHOT_STATE["dirty"]:
+        return
+    temp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as snapshot:
+            marshal.dump(SNAPSHOT_STATE["sections"], snapshot)
+        os.replace(temp_path, SNAPSHOT_PATH)
+        SNAPSHOT_STATE["dirty"] = False
+    except OSError:
+        pass
+
+
+def load_section(section: str):
+    """
+    Returns the parsed config for a section from the snapshot, re-reading
+    the section's JSON file and updating the snapshot if the file changed
+    since the snapshot was written.
+    """
+    sections = read_snapshot()
+    stamp = source_stamp(section)
+    cached = sections.get(section)
+    if cached is not None and tuple(cached[0]) == stamp:
+        return marshal.loads(cached[1])
+
+    with open(source_path(section), "r", encoding="utf-8") as config_file:
+        data = json.load(config_file)
+    sections[section] = (stamp, marshal.dumps(data))
+    SNAPSHOT_STATE["dirty"] = True
+    write_snapshot()
+    return data
+
+
+def load_all() -> dict:
+    """
+    Returns every config section, e.g. to rebuild the snapshot ahead of time.
+    """
+    return {section: load_section(section) for section in CONFIG_FILES}
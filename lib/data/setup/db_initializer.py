@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
+from __init__ import DB
 from models import Participant, Team
+from util.db_helpers import (
+    clear_corrupt_rows,
+    set_paranoid_load,
+    CORRUPT_ROWS,
+    LOAD_STATS,
+)
 
 
 def initialize_db():
@@ -14,8 +24,87 @@ def initialize_db():
     Participant.build_table()
     Team.build_table()
 
-    Team.create("FREE AGENT", True)
+    Team.create("FREE AGENT", True).save()
+
+
+def sync_schema():
+    """
+    Creates any missing tables and declared indexes without touching the
+    existing data.
+    """
+    Team.build_table()
+    Participant.build_table()
+
+
+def check_indexes() -> dict:
+    """
+    Returns a dict of table models and the declared indexes missing from the
+    live database, omitting models that have every declared index.
+    """
+    report = {model.__name__: model.missing_indexes() for model in (Team, Participant)}
+    return {model: missing for model, missing in report.items() if missing}
+
+
+def verify_rows() -> tuple:
+    """
+    Loads every team and participant with paranoid loading enabled and
+    returns the number of rows that fail validation along with the (model,
+    id, error) entries of the latest CORRUPT_ROWS.maxlen of them.
+    """
+    set_paranoid_load(True)
+    try:
+        clear_corrupt_rows()
+        for model in (Team, Participant):
+            model.fetch()
+    finally:
+        set_paranoid_load(False)
+    return LOAD_STATS["corrupt_rows"], list(CORRUPT_ROWS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Initialize the league database.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--check",
+        action="store_true",
+        help="report declared indexes that are missing from the database",
+    )
+    mode.add_argument(
+        "--sync",
+        action="store_true",
+        help="create missing tables and indexes without deleting any data",
+    )
+    mode.add_argument(
+        "--verify",
+        action="store_true",
+        help="re-validate every stored row and report the rows that fail",
+    )
+    parser.add_argument(
+        "--db", type=Path, default=None, help="database file to initialize"
+    )
+    args = parser.parse_args()
+    DB.configure(args.db)
+
+    if args.check:
+        missing = check_indexes()
+        for model, index_names in missing.items():
+            print(f"{model}: missing {', '.join(index_names)}")
+        if not missing:
+            print("All declared indexes are present.")
+        sys.exit(1 if missing else 0)
+    elif args.sync:
+        sync_schema()
+    elif args.verify:
+        corrupt_count, corrupt_rows = verify_rows()
+        for model, row_id, error in corrupt_rows:
+            print(f"{model} {row_id}: {error}")
+        if corrupt_count > len(corrupt_rows):
+            print(f"Only the last {len(corrupt_rows)} invalid rows are listed.")
+        print(f"{corrupt_count} invalid row(s) found.")
+        sys.exit(1 if corrupt_count else 0)
+    else:
+        initialize_db()
 
 
 if __name__ == "__main__":
-    initialize_db()
+    main()
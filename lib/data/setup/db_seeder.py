@@ -1,55 +1,224 @@
 #!/usr/bin/env python3
 
+import argparse
+import random
 import sys
+import time
+from datetime import date
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-
-from models import Participant, Team
-
-
-def seed_db():
-    m1 = Participant.create("Andrew", "Smith", "1992-05-06")
-    m2 = Participant.create("Brandie", "Jones", "1991-11-09")
-    m3 = Participant.create("Chuck", "Johnson", "1998-07-23")
-    m4 = Participant.create("Dorothy", "Walker", "1999-09-06")
-    m5 = Participant.create("Evan", "Roberts", "1999-12-03")
-    m6 = Participant.create("Fiona", "Williams", "1999-03-03")
-    m7 = Participant.create("Greg", "St. Dennis", "1999-02-13")
-    m8 = Participant.create("Hermoine", "Kemble", "2000-02-23")
-    m9 = Participant.create("Ian", "Carson", "2000-12-05")
-    m10 = Participant.create("Janice", "Black", "1999-04-28")
-    m11 = Participant.create("Kenny", "White", "1995-05-21")
-    m12 = Participant.create("Lourda", "Grey", "1983-06-11")
-    m13 = Participant.create("Martin", "Oliver", "1995-01-02")
-    m14 = Participant.create("Natalie", "Kimmel", "1998-12-22")
-    m15 = Participant.create("Oscar", "O'Brien", "1995-11-22")
-    m16 = Participant.create("Patty", "Myers", "1997-03-03")
-    m17 = Participant.create("Quentin", "Winter", "1999-02-03")
-    m18 = Participant.create("Rita", "Haskell", "1967-01-29")
-    m19 = Participant.create("Stuart", "Branch", "1978-11-23")
-    m20 = Participant.create("Tina", "Harris-Jones", "1979-07-21")
-
-    t1 = Team.create("The Aristocrats")
-    t2 = Team.create("Catch Me If You Can")
-    t3 = Team.create("The Dropouts")
-    t4 = Team.create("Down the Rabbit Hole")
-    t5 = Team.create("The Hooligans")
-
-    team_lists = [
-        (m1, m6, m11, m16),
-        (m2, m7, m12, m17),
-        (m3, m8, m13, m18),
-        (m4, m9, m14, m19),
-        (m5, m10, m15, m20),
-    ]
-
-    teams = [t1, t2, t3, t4, t5]
-
-    for i in range(5):
-        for mem in team_lists[i]:
-            teams[i].append_participant(mem, do_persist=True)
+LIB_PATH = str(Path(__file__).resolve().parent.parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+
+from models import Team
+from config import (
+    PARTICIPANT_TABLE_CONFIG,
+    TEAM_MODEL_CONFIG,
+    TEAM_TABLE_CONFIG,
+)
+from __init__ import DB
+from util.db_helpers import (
+    insert_rows,
+    iter_rows,
+    create_indexes,
+    drop_indexes,
+    BULK_CHUNK_SIZE,
+)
+from db_initializer import initialize_db
+
+FIRST_NAMES = (
+    "Andrew", "Brandie", "Chuck", "Dorothy", "Evan", "Fiona", "Greg", "Hermoine",
+    "Ian", "Janice", "Kenny", "Lourda", "Martin", "Natalie", "Oscar", "Patty",
+    "Quentin", "Rita", "Stuart", "Tina", "Uma", "Victor", "Wendy", "Xavier",
+    "Yolanda", "Zach", "Mary-Kate", "Jo", "D'Arcy", "St. John",
+)  # fmt: skip
+
+LAST_NAMES = (
+    "Smith", "Jones", "Johnson", "Walker", "Roberts", "Williams", "St. Dennis",
+    "Kemble", "Carson", "Black", "White", "Grey", "Oliver", "Kimmel", "O'Brien",
+    "Myers", "Winter", "Haskell", "Branch", "Harris-Jones", "Nguyen", "Garcia",
+    "MacDonald", "de la Cruz", "Okafor", "Lindqvist", "Novak", "Tanaka",
+)  # fmt: skip
+
+TEAM_ADJECTIVES = (
+    "Clever", "Curious", "Mighty", "Quizzical", "Brainy", "Lucky", "Sneaky",
+    "Rowdy", "Humble", "Fearless", "Puzzled", "Wise",
+)  # fmt: skip
+
+TEAM_NOUNS = (
+    "Owls", "Foxes", "Scholars", "Hooligans", "Aristocrats", "Dropouts",
+    "Maniacs", "Brainiacs", "Bookworms", "Ravens", "Wizards", "Pundits",
+)  # fmt: skip
+
+# range of generated birth dates, pre-rendered once as ISO strings
+BIRTH_DATES = tuple(
+    date.fromordinal(ordinal).isoformat()
+    for ordinal in range(
+        date(1950, 1, 1).toordinal(), date(2005, 12, 31).toordinal() + 1
+    )
+)
+
+PARTICIPANT_COLUMNS = ("f_name", "l_name", "birth_date", "team_id")
+TEAM_COLUMNS = ("name", "is_free_agents")
+
+
+def generate_team_rows(rng: random.Random, team_count: int, taken: set = None):
+    """
+    Yields (name, is_free_agents) rows for team_count competitive teams. Names
+    are built from adjective/noun pairs and receive a numeric suffix once the
+    pairs run out so that every name is unique. Names in taken (lowercased,
+    as team names are unique regardless of case) are skipped.
+    """
+    taken = taken or set()
+    pair_count = len(TEAM_ADJECTIVES) * len(TEAM_NOUNS)
+    offset = rng.randrange(pair_count)
+    index = 0
+    while team_count > 0:
+        pair = (index + offset) % pair_count
+        adjective = TEAM_ADJECTIVES[pair // len(TEAM_NOUNS)]
+        noun = TEAM_NOUNS[pair % len(TEAM_NOUNS)]
+        cycle = index // pair_count
+        suffix = f" {cycle + 1}" if cycle else ""
+        name = f"The {adjective} {noun}{suffix}"
+        index += 1
+        if name.lower() not in taken:
+            team_count -= 1
+            yield (name, False)
+
+
+def taken_team_names() -> set:
+    """
+    Returns the lowercased names of the teams already in the database.
+    """
+    name_index = list(TEAM_TABLE_CONFIG["columns"]).index("name")
+    return {row[name_index].lower() for row in iter_rows(TEAM_TABLE_CONFIG)}
+
+
+def generate_participant_rows(
+    rng: random.Random,
+    participant_count: int,
+    team_ids: range,
+    free_team_id: int,
+    free_agent_share: float,
+):
+    """
+    Yields participant rows, filling each team with between one and
+    max_team_participants members until the share of participants reserved
+    for teams runs out. Every remaining participant is a free agent.
+    """
+    max_size = TEAM_MODEL_CONFIG["max_team_participants"]
+    remaining = participant_count - round(participant_count * free_agent_share)
+    choice = rng.choice
+
+    def participant(team_id):
+        return (choice(FIRST_NAMES), choice(LAST_NAMES), choice(BIRTH_DATES), team_id)
+
+    for team_id in team_ids:
+        if remaining <= 0:
+            break
+        team_size = min(rng.randint(1, max_size), remaining)
+        remaining -= team_size
+        for _ in range(team_size):
+            yield participant(team_id)
+        participant_count -= team_size
+
+    for _ in range(participant_count):
+        yield participant(free_team_id)
+
+
+def seed_db(
+    team_count: int = 5,
+    participant_count: int = 20,
+    seed: int = None,
+    free_agent_share: float = 0.2,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    reset: bool = True,
+):
+    """
+    Builds a synthetic league of team_count teams and participant_count
+    participants, streaming the generated rows to the database in chunks.
+    The same seed always produces the same league. When the database is
+    reset, the indexes are built once after loading instead of being
+    updated row by row.
+    """
+    if reset:
+        initialize_db()
+        for table_def in (TEAM_TABLE_CONFIG, PARTICIPANT_TABLE_CONFIG):
+            drop_indexes(table_def)
+
+    free_team = Team.fetch_free_agent_team()
+    if free_team is None:
+        free_team = Team.create("FREE AGENT", True).save()
+
+    # appended teams must not reuse the names of the existing ones
+    taken = set() if reset else taken_team_names()
+    rng = random.Random(seed)
+    team_ids = insert_rows(
+        TEAM_TABLE_CONFIG,
+        TEAM_COLUMNS,
+        generate_team_rows(rng, team_count, taken),
+        chunk_size,
+    )
+    participant_ids = insert_rows(
+        PARTICIPANT_TABLE_CONFIG,
+        PARTICIPANT_COLUMNS,
+        generate_participant_rows(
+            rng, participant_count, team_ids, free_team.id, free_agent_share
+        ),
+        chunk_size,
+    )
+
+    if reset:
+        for table_def in (TEAM_TABLE_CONFIG, PARTICIPANT_TABLE_CONFIG):
+            create_indexes(table_def)
+    return team_ids, participant_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Populate the database with a synthetic trivia league."
+    )
+    parser.add_argument("-t", "--teams", type=int, default=5)
+    parser.add_argument("-p", "--participants", type=int, default=20)
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument(
+        "--free-agent-share",
+        type=float,
+        default=0.2,
+        help="fraction of participants left on the free agent team",
+    )
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--db", type=Path, default=None, help="database file to seed")
+    parser.add_argument(
+        "--profile",
+        default="bulk-load",
+        help="connection profile used while seeding (default: bulk-load)",
+    )
+    parser.add_argument(
+        "--no-reset",
+        action="store_true",
+        help="append to the existing data instead of re-initializing the database",
+    )
+    args = parser.parse_args()
+    DB.configure(args.db, args.profile)
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    start = time.perf_counter()
+    team_ids, participant_ids = seed_db(
+        args.teams,
+        args.participants,
+        seed,
+        args.free_agent_share,
+        args.chunk_size,
+        not args.no_reset,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Seeded {len(team_ids)} teams and {len(participant_ids)} participants "
+        f"in {elapsed:.2f}s (seed {seed})"
+    )
 
 
 if __name__ == "__main__":
-    seed_db()
+    main()
@@ -1,2 +1,3 @@
 from .participant import Participant
 from .team import Team
+from .league import League
@@ -0,0 +1,60 @@
+import sys
+from itertools import groupby
+from pathlib import Path
+
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+
+from config import TEAM_TABLE_CONFIG, PARTICIPANT_TABLE_CONFIG
+from util.db_helpers import parse_db_row, select_with_children
+from models.participant import Participant
+from models.team import Team
+
+
+class League:
+    """
+    A snapshot of the whole league: the competing teams in name order, each
+    with its roster attached as team.roster, and the free agent team, whose
+    roster is the free agent pool.
+    """
+
+    def __init__(self, teams: list, free_team: Team = None):
+        self.teams = teams
+        self.free_team = free_team
+
+    def __repr__(self):
+        return (
+            f"<<LEAGUE: {len(self.teams)} teams, {len(self.free_agents)} free agents>>"
+        )
+
+    @property
+    def free_agents(self) -> list:
+        return self.free_team.roster if self.free_team is not None else []
+
+    @classmethod
+    def load(cls):
+        """
+        Loads every team and participant with a single JOIN query, streamed
+        and grouped by team in one pass, instead of one roster query per
+        team. Rosters are ordered like Participant.fetch() and replace the
+        teams' previous rosters. The free agent team is the team flagged
+        with is_free_agents.
+        """
+        teams = []
+        free_team = None
+        rows = select_with_children(
+            TEAM_TABLE_CONFIG, PARTICIPANT_TABLE_CONFIG, "team_id"
+        )
+        for team_row, team_rows in groupby(rows, key=lambda pair: pair[0]):
+            team = parse_db_row(Team, team_row)
+            team.roster = [
+                parse_db_row(Participant, participant_row)
+                for _, participant_row in team_rows
+                if participant_row is not None
+            ]
+            if team.is_free_agents and free_team is None:
+                free_team = team
+            else:
+                teams.append(team)
+        return cls(teams, free_team)
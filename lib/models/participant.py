@@ -1,7 +1,10 @@
 import sys
 from pathlib import Path
+from typing import Iterable
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
 from config import (
     PARTICIPANT_MODEL_CONFIG as MODEL_CONFIG,
@@ -10,13 +13,23 @@ from config import (
 from validation.backend import validate_name, validate_date
 from util.db_helpers import (
     create_table,
+    missing_indexes,
     drop_table,
     insert_row,
+    insert_instances,
     update_row,
     del_row,
+    count_rows,
     select_all_rows,
+    select_page,
+    column_name,
     parse_db_row,
+    get_instances,
+    IDENTITY_MAP,
 )
+from util.errors import StaleRowError
+from util.styling import fmt_participant_name, forget_label
+from util.async_db import run_in_worker, iter_pages, ASYNC_PAGE_SIZE
 
 
 class Participant:
@@ -35,10 +48,47 @@ class Participant:
         self.birth_date = birth_date
         self.team_id = team_id
         self.id = id
+        self.version = 1
+
+    @classmethod
+    def from_trusted_row(cls, *row):
+        """
+        Builds a participant from values that were validated before they were
+        written to the database, bypassing the validating setters.
+        """
+        return cls.__new__(cls).load_trusted_row(*row)
+
+    def load_trusted_row(
+        self,
+        id: int,
+        f_name: str,
+        l_name: str,
+        birth_date: str,
+        team_id: int,
+        version: int = 1,
+    ):
+        """
+        Sets the participant's values from a database row without running the
+        validating setters. Used to build participants from trusted rows and to
+        refresh a loaded participant whose row was changed by another session.
+        """
+        self._f_name = f_name
+        self._l_name = l_name
+        self._birth_date = birth_date
+        self.team_id = team_id
+        self.id = id
+        self.version = version
+        return self
 
     def __repr__(self):
         return f"<<PARTICIPANT: {self.l_name.upper()}, {self.f_name} (id {self.id}, team {self.team_id})>>"
 
+    def display_name(self) -> str:
+        """
+        Returns the participant's name as shown in the CLI, e.g. 'SMITH, Jo'.
+        """
+        return fmt_participant_name(self.f_name, self.l_name)
+
     @property
     def f_name(self):
         return self._f_name
@@ -47,6 +97,7 @@ class Participant:
     @validate_name("participant", "f_name")
     def f_name(self, f_name):
         self._f_name = f_name
+        forget_label(self)
 
     @property
     def l_name(self):
@@ -56,6 +107,7 @@ class Participant:
     @validate_name("participant", "l_name")
     def l_name(self, l_name):
         self._l_name = l_name
+        forget_label(self)
 
     @property
     def birth_date(self):
@@ -75,6 +127,14 @@ class Participant:
         """
         create_table(TABLE_CONFIG)
 
+    @classmethod
+    def missing_indexes(cls) -> list:
+        """
+        Returns the names of the indexes declared in TABLE_CONFIG that do
+        not exist in the connected database.
+        """
+        return missing_indexes(TABLE_CONFIG)
+
     @classmethod
     def del_table(cls):
         """
@@ -105,6 +165,93 @@ class Participant:
         db_data = select_all_rows(TABLE_CONFIG, team_id)
         return [parse_db_row(cls, row) for row in db_data]
 
+    @classmethod
+    def fetch_page(
+        cls,
+        team_id: int = None,
+        limit: int = ASYNC_PAGE_SIZE,
+        after: tuple = None,
+        before: tuple = None,
+        prefix: str = None,
+    ):
+        """
+        Fetches one page of at most limit participants tagged with team_id (or
+        of all participants if team_id is None), ordered by last name, first
+        name and id, optionally narrowed to last
+        names starting with prefix (case-insensitive). 'after' and 'before'
+        take the sort_key() of the participant that the previous page ended
+        or began with. Returns a Page of Participant instances.
+        """
+        criteria = {} if team_id is None else {"team_id": team_id}
+        page = select_page(TABLE_CONFIG, limit, after, before, prefix, **criteria)
+        return page._replace(items=[parse_db_row(cls, row) for row in page.items])
+
+    @classmethod
+    def get(cls, id: int):
+        """
+        Returns the participant with the provided id or None if there is no such
+        record. A participant already loaded in this session is returned without
+        querying the database.
+        """
+        return cls.get_many((id,)).get(id)
+
+    @classmethod
+    def get_many(cls, ids: Iterable) -> dict:
+        """
+        Returns {id: participant} for the participants with the provided ids (any
+        iterable, duplicates allowed), skipping ids without a record. Loaded
+        participants are taken from the identity map and the rest are read with
+        chunked primary-key queries, so thousands of ids take a handful of
+        queries.
+        """
+        return get_instances(cls, TABLE_CONFIG, ids)
+
+    @classmethod
+    async def afetch(cls, team_id: int = None):
+        """
+        Asynchronous fetch(): loads the participants on a database worker
+        thread without blocking the event loop.
+        """
+        return await run_in_worker(cls.fetch, team_id)
+
+    @classmethod
+    def aiter(cls, team_id: int = None, page_size: int = ASYNC_PAGE_SIZE):
+        """
+        Asynchronously iterates over the participants tagged with team_id (or
+        all participants) in fetch() order, reading page_size rows at a time
+        on a database worker thread.
+        """
+        return iter_pages(cls.fetch_page, page_size, team_id=team_id)
+
+    @classmethod
+    def count(cls, team_id: int) -> int:
+        """
+        Returns the number of participants tagged with team_id in the
+        database, including those added by other sessions.
+        """
+        return count_rows(TABLE_CONFIG, team_id=team_id)
+
+    @classmethod
+    def bulk_create(cls, participants: Iterable) -> range:
+        """
+        Saves every participant in the provided iterable (a list or a
+        generator) to the participants table in a single transaction using
+        chunked bulk inserts, assigning each participant its new id. Returns
+        the range of assigned ids.
+        """
+        return insert_instances(
+            TABLE_CONFIG, ("f_name", "l_name", "birth_date", "team_id"), participants
+        )
+
+    def sort_key(self) -> tuple:
+        """
+        Returns the participant's values for the table's sort columns, which
+        identify its position in paginated listings.
+        """
+        return tuple(
+            getattr(self, column_name(col)) for col in TABLE_CONFIG["sort_columns"]
+        )
+
     def save(self):
         """
         Adds a new participant's record to the participants table and assigns the
@@ -120,13 +267,18 @@ class Participant:
             team_id=self.team_id,
         )
         self.id = participant_id
+        self.version = 1
+        IDENTITY_MAP.add(self)
 
     def update(self):
         """
         Overwrites a participant's database record with info changes. Allows
         for the team_id to be passed in and sent to the database, enabling a
         foreign-key relationship between members and teams in the database,
-        while relating through object-orientation in the code.
+        while relating through object-orientation in the code. Raises
+        StaleRowError if another session changed or deleted the record since it
+        was loaded; the participant is then dropped from the identity map so
+        that the next fetch loads the current record.
         """
         updates = {
             "f_name": self.f_name,
@@ -134,26 +286,50 @@ class Participant:
             "birth_date": self.birth_date,
             "team_id": self.team_id,
         }
-        update_row(
-            TABLE_CONFIG,
-            self.id,
-            **updates,
-        )
+        try:
+            update_row(TABLE_CONFIG, self.id, self.version, **updates)
+        except StaleRowError:
+            IDENTITY_MAP.evict(self)
+            raise
+        self.version += 1
         return self
 
     def delete(self):
         """
         Deletes participant's database record, removes the participant's record
-        in its team's participants list, and then nullifies self.id.
+        in its team's participants list, and then nullifies self.id. Raises
+        StaleRowError if another session changed or deleted the record since it
+        was loaded.
         """
-        del_row(TABLE_CONFIG, self.id)
+        try:
+            del_row(TABLE_CONFIG, self.id, self.version)
+        finally:
+            IDENTITY_MAP.evict(self)
         self.id = None
 
+    async def asave(self):
+        """
+        Asynchronous save() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.save)
+
+    async def aupdate(self):
+        """
+        Asynchronous update() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.update)
+
+    async def adelete(self):
+        """
+        Asynchronous delete() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.delete)
+
     def team(self):
         """
-        Returns the team associated with the participant.
+        Returns the team associated with the participant or None. To resolve
+        the teams of many participants, use Team.get_many() on their team ids.
         """
         from models.team import Team
 
-        my_team = Team.fetch(self.team_id)
-        return next(my_team, None)
+        return Team.get(self.team_id)
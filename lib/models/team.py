@@ -1,22 +1,43 @@
 import sys
 from pathlib import Path
+from collections import namedtuple
+from typing import Iterable
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
 from config import (
     TEAM_MODEL_CONFIG as MODEL_CONFIG,
     TEAM_TABLE_CONFIG as TABLE_CONFIG,
+    PARTICIPANT_TABLE_CONFIG,
 )
 from validation.backend import validate_name
 from util.db_helpers import (
     create_table,
+    missing_indexes,
     drop_table,
     insert_row,
+    insert_instances,
     update_row,
     del_row,
+    reassign_rows,
     select_all_rows,
+    select_page,
+    select_page_with_counts,
+    column_name,
     parse_db_row,
+    get_instances,
+    select_row_by_search_value,
+    transaction,
+    IDENTITY_MAP,
 )
+from util.errors import StaleRowError, TeamFullError
+from util.styling import forget_label
+from util.async_db import run_in_worker, iter_pages, ASYNC_PAGE_SIZE
+
+# a team and the number of participants on it when it was loaded
+TeamCount = namedtuple("TeamCount", ("team", "participant_count"))
 
 
 class Team:
@@ -26,10 +47,43 @@ class Team:
         self.name = name
         self.is_free_agents = is_free_agents
         self.id = None
+        self.version = 1
+        # the team's participants, when loaded with League.load()
+        self.roster = None
+
+    @classmethod
+    def from_trusted_row(cls, *row):
+        """
+        Builds a team from values that were validated before they were
+        written to the database, bypassing the validating setters.
+        """
+        team = cls.__new__(cls)
+        team.roster = None
+        return team.load_trusted_row(*row)
+
+    def load_trusted_row(
+        self, id: int, name: str, is_free_agents: bool, version: int = 1
+    ):
+        """
+        Sets the team's values from a database row without running the
+        validating setters. Used to build teams from trusted rows and to
+        refresh a loaded team whose row was changed by another session.
+        """
+        self._name = name
+        self.is_free_agents = is_free_agents
+        self.id = id
+        self.version = version
+        return self
 
     def __repr__(self):
         return f"<<TEAM: {self.name}>>"
 
+    def display_name(self) -> str:
+        """
+        Returns the team's name as shown in the CLI.
+        """
+        return self.name
+
     @property
     def name(self):
         return self._name
@@ -38,6 +92,7 @@ class Team:
     @validate_name("team", "name")
     def name(self, name):
         self._name = name
+        forget_label(self)
 
     @classmethod
     def build_table(cls):
@@ -48,6 +103,14 @@ class Team:
         """
         create_table(TABLE_CONFIG)
 
+    @classmethod
+    def missing_indexes(cls) -> list:
+        """
+        Returns the names of the indexes declared in TABLE_CONFIG that do
+        not exist in the connected database.
+        """
+        return missing_indexes(TABLE_CONFIG)
+
     @classmethod
     def del_table(cls):
         """
@@ -69,13 +132,147 @@ class Team:
     @classmethod
     def fetch(cls, tid: int = None):
         """
-        Fetches all records from the 'teams' table. Returns a list
-        of all Team instances or empty list if none found.
+        Fetches all records from the 'teams' table, or only the team with
+        the provided id. Returns a list of all Team instances or empty list
+        if none found.
         """
+        if tid is not None:
+            return list(cls.get_many((tid,)).values())
         db_data = select_all_rows(TABLE_CONFIG, tid)
         result = [parse_db_row(cls, row) for row in db_data]
         return result
 
+    @classmethod
+    def fetch_page(
+        cls,
+        limit: int = ASYNC_PAGE_SIZE,
+        after: tuple = None,
+        before: tuple = None,
+        prefix: str = None,
+        is_free_agents: bool = False,
+    ):
+        """
+        Fetches one page of at most limit teams ordered by name and id,
+        excluding the free agent team unless is_free_agents is True and
+        optionally narrowed to names starting with prefix (case-insensitive).
+        'after' and 'before' take the sort_key() of the team that the previous
+        page ended or began with. Returns a Page of Team instances.
+        """
+        page = select_page(
+            TABLE_CONFIG, limit, after, before, prefix, is_free_agents=is_free_agents
+        )
+        return page._replace(items=[parse_db_row(cls, row) for row in page.items])
+
+    @classmethod
+    def get_by_name(cls, name: str):
+        """
+        Returns the team with the provided name (ignoring case) or None.
+        """
+        row = select_row_by_search_value(TABLE_CONFIG, name)
+        return parse_db_row(cls, row) if row is not None else None
+
+    @classmethod
+    def fetch_with_counts(
+        cls,
+        limit: int = ASYNC_PAGE_SIZE,
+        after: tuple = None,
+        before: tuple = None,
+        prefix: str = None,
+    ) -> tuple:
+        """
+        Fetches a page of competing teams like fetch_page(), together with
+        each team's participant count and the free agent team, in a single
+        GROUP BY query. Returns (Page of TeamCount tuples, free agent team or
+        None).
+        """
+        page, free_row = select_page_with_counts(
+            TABLE_CONFIG,
+            PARTICIPANT_TABLE_CONFIG,
+            "team_id",
+            limit,
+            after,
+            before,
+            prefix,
+            extra_criteria={"is_free_agents": True},
+            is_free_agents=False,
+        )
+        free_team = parse_db_row(cls, free_row) if free_row is not None else None
+        items = [TeamCount(parse_db_row(cls, row), count) for row, count in page.items]
+        return (page._replace(items=items), free_team)
+
+    def is_full(self, participant_count: int) -> bool:
+        """
+        Tells whether a team with participant_count participants has no room
+        for another one. The free agent team is never full.
+        """
+        return (
+            not self.is_free_agents
+            and participant_count >= MODEL_CONFIG["max_team_participants"]
+        )
+
+    @classmethod
+    def get(cls, id: int):
+        """
+        Returns the team with the provided id or None if there is no such
+        record. A team already loaded in this session is returned without
+        querying the database.
+        """
+        return cls.get_many((id,)).get(id)
+
+    @classmethod
+    def get_many(cls, ids: Iterable) -> dict:
+        """
+        Returns {id: team} for the teams with the provided ids (any
+        iterable, duplicates allowed), skipping ids without a record. Loaded
+        teams are taken from the identity map and the rest are read with
+        chunked primary-key queries, so thousands of ids take a handful of
+        queries.
+        """
+        return get_instances(cls, TABLE_CONFIG, ids)
+
+    @classmethod
+    async def afetch(cls, tid: int = None):
+        """
+        Asynchronous fetch(): loads the teams on a database worker thread
+        without blocking the event loop.
+        """
+        return await run_in_worker(cls.fetch, tid)
+
+    @classmethod
+    def aiter(cls, is_free_agents: bool = False, page_size: int = ASYNC_PAGE_SIZE):
+        """
+        Asynchronously iterates over the competing teams (or the free agent team if
+        is_free_agents is True) in fetch() order, reading page_size rows at a
+        time on a database worker thread.
+        """
+        return iter_pages(cls.fetch_page, page_size, is_free_agents=is_free_agents)
+
+    @classmethod
+    def fetch_free_agent_team(cls):
+        """
+        Returns the team flagged as the free agent team or None if there is
+        none.
+        """
+        return next(iter(cls.fetch_page(1, is_free_agents=True).items), None)
+
+    @classmethod
+    def bulk_create(cls, teams: Iterable) -> range:
+        """
+        Saves every team in the provided iterable (a list or a generator) to
+        the teams table in a single transaction using chunked bulk inserts,
+        assigning each team its new id. Returns the range of assigned ids.
+        """
+        return insert_instances(TABLE_CONFIG, ("name", "is_free_agents"), teams)
+
+    def sort_key(self) -> tuple:
+        """
+        Returns the team's values for the table's sort columns, which
+        identify its position in paginated listings.
+        """
+        return tuple(
+            getattr(self, column_name(col)) for col in TABLE_CONFIG["sort_columns"]
+        )
+
     def save(self):
         """
         Adds a new record to the teams table and assigns the row id to
@@ -87,27 +284,60 @@ class Team:
             is_free_agents=self.is_free_agents,
         )
         self.id = team_id
+        self.version = 1
+        IDENTITY_MAP.add(self)
         return self
 
     def update(self):
         """
-        Overwrites a team's database record with new values.
+        Overwrites a team's database record with new values. Raises
+        StaleRowError if another session changed or deleted the record since it
+        was loaded.
         """
-        update_row(
-            TABLE_CONFIG,
-            self.id,
-            name=self.name,
-            is_free_agents=self.is_free_agents,
-        )
+        try:
+            update_row(
+                TABLE_CONFIG,
+                self.id,
+                self.version,
+                name=self.name,
+                is_free_agents=self.is_free_agents,
+            )
+        except StaleRowError:
+            IDENTITY_MAP.evict(self)
+            raise
+        self.version += 1
         return self
 
     def delete(self):
         """
-        Deletes team's database record and then nullifies self.id.
+        Deletes team's database record and then nullifies self.id. Raises
+        StaleRowError if another session changed or deleted the record since it
+        was loaded.
         """
-        del_row(TABLE_CONFIG, self.id)
+        try:
+            del_row(TABLE_CONFIG, self.id, self.version)
+        finally:
+            IDENTITY_MAP.evict(self)
         self.id = None
 
+    async def asave(self):
+        """
+        Asynchronous save() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.save)
+
+    async def aupdate(self):
+        """
+        Asynchronous update() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.update)
+
+    async def adelete(self):
+        """
+        Asynchronous delete() that runs on a database worker thread.
+        """
+        return await run_in_worker(self.delete)
+
     def fetch_participants(self) -> list:
         """
         Uses the Participant.fetch() method to load all participants tagged
@@ -116,3 +346,47 @@ class Team:
         from models.participant import Participant
 
         return Participant.fetch(self.id)
+
+    def release_participants(self, free_team: "Team") -> int:
+        """
+        Moves every participant on the team to the free agent team with one
+        statement, including participants added by other sessions since the
+        team's roster was loaded, so that the team can then be deleted.
+        Returns the number of participants moved.
+        """
+        from models.participant import Participant
+
+        count = reassign_rows(
+            PARTICIPANT_TABLE_CONFIG, "team_id", self.id, free_team.id
+        )
+        # loaded participants still have the old team_id; later lookups
+        # reload them instead
+        IDENTITY_MAP.clear(Participant)
+        return count
+
+    def add_participant(self, participant):
+        """
+        Assigns the participant to the team and saves it (or updates it if it
+        already has a record). The team's size is counted in the database
+        inside the same write transaction, so sessions adding participants at
+        the same time cannot take a team past max_team_participants. Raises
+        TeamFullError if the team is full and StaleRowError if another session
+        changed the participant first, leaving the participant's team_id
+        unchanged in both cases.
+        """
+        from models.participant import Participant
+
+        previous_team_id = participant.team_id
+        try:
+            with transaction():
+                if not self.is_free_agents and self.is_full(Participant.count(self.id)):
+                    raise TeamFullError(f"{self.name} is full.")
+                participant.team_id = self.id
+                if participant.id is None:
+                    participant.save()
+                else:
+                    participant.update()
+        except (TeamFullError, StaleRowError):
+            participant.team_id = previous_team_id
+            raise
+        return participant
@@ -1,2 +1,3 @@
 from .get_attr_value import main as get_attr_value
-from .process_menu_response import main as process_menu_response
+from .process_menu_response import main as process_menu_response, PrefixFilter
+from .run_batch import main as run_batch
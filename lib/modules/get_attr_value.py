@@ -1,7 +1,9 @@
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
 from util.helpers import get_input_with_prompt
 from validation.frontend import validate_date, validate_name
@@ -1,9 +1,13 @@
 import sys
+from collections import namedtuple
 from pathlib import Path
 from typing import Union
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
+from classes import Menu
 from models import Participant, Team
 from config import OPS_CONFIG
 from util.warnings import (
@@ -13,13 +17,20 @@ from util.warnings import (
 )
 from util.helpers import get_input_with_prompt
 
+# a response starting with FILTER_MARKER at a filterable menu is a name prefix
+# (e.g. "/smi") that narrows the menu; the marker alone clears the filter
+FILTER_MARKER = "/"
+PrefixFilter = namedtuple("PrefixFilter", ("prefix",))
+
 
 def ensure_valid_selection(
-    response: Union[str, int], menu_options: tuple, nav_options: tuple
+    response: str,
+    menu: Menu,
+    allow_filter: bool = False,
 ) -> bool:
-    valid_numbers = list(option[0] for option in menu_options)
-    valid_letters = list(option[0].lower() for option in nav_options)
-    if response.lower() in valid_numbers + valid_letters:
+    if allow_filter and response.startswith(FILTER_MARKER):
+        return True
+    if response in menu:
         return True
     warn_invalid_selection()
     return False
@@ -28,8 +39,7 @@ def ensure_valid_selection(
 def ensure_team_not_full(team: Team, participant_count: int) -> bool:
     if team is None and participant_count is None:
         return True
-    max_size = team.CONFIG["max_team_participants"]
-    if 0 <= participant_count < max_size:
+    if not team.is_full(participant_count):
         return True
     warn_team_full()
     return False
@@ -46,19 +56,17 @@ def ensure_team_not_empty(participant_count: int) -> bool:
 
 def validate_response(
     response: str,
-    menu_options: tuple,
-    nav_options: tuple,
+    menu: Menu,
     team: Team,
     participant_count: int,
+    allow_filter: bool = False,
 ) -> bool:
-    is_valid_selection = ensure_valid_selection(response, menu_options, nav_options)
+    is_valid_selection = ensure_valid_selection(response, menu, allow_filter)
 
     if not is_valid_selection:
         return False
 
-    menu_option = next(
-        (option for option in menu_options if option[0] == response), None
-    )
+    menu_option = menu.get_option(response)
 
     if not menu_option:
         return is_valid_selection
@@ -78,32 +86,36 @@ def validate_response(
 
 
 def main(
-    menu_options: tuple,
-    nav_options: tuple,
+    menu: Menu,
     team: Team = None,
     participant_count: int = None,
+    allow_filter: bool = False,
     **sentinels: dict,
-) -> Union[Participant, Team, str, object]:
+) -> Union[Participant, Team, str, PrefixFilter, object]:
     """
     Allows the user to input a value. If the value is a valid menu option
     selector and - in the case of operation selection - if the selected team's
     participant count aligns with the needs of the operation, returns either the
     team or participant object associated to the numeric menu selection or returns
-    the navigation sentinel associated to the alphanetic menu selection.
+    the navigation sentinel associated to the alphanetic menu selection. If
+    allow_filter is set, a response starting with FILTER_MARKER is returned as a
+    PrefixFilter holding the typed name prefix.
     """
     end_loop = False
     while not end_loop:
         user_response = get_input_with_prompt("Enter your selection: ").lower()
         end_loop = validate_response(
-            user_response, menu_options, nav_options, team, participant_count
+            user_response,
+            menu,
+            team,
+            participant_count,
+            allow_filter,
         )
 
-    all_options = list(menu_options) + list(nav_options)
-    selected_option = next(
-        (option for option in all_options if option[0].lower() == user_response)
-    )
+    if allow_filter and user_response.startswith(FILTER_MARKER):
+        return PrefixFilter(user_response[len(FILTER_MARKER) :].strip())
 
-    if user_response.isdigit():
-        return selected_option[2]
-    else:
-        return sentinels[selected_option[2]]
+    menu_option = menu.get_option(user_response)
+    if menu_option is not None:
+        return menu_option[2]
+    return sentinels[menu.get_nav_option(user_response)[2]]
@@ -0,0 +1,241 @@
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from sqlite3 import IntegrityError
+
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+
+from models import Participant, Team
+from config import CONNECTION_CONFIG, OPS_CONFIG
+from strings.display_messages import TEAM_FULL, TEAM_NAME_TAKEN, STALE_DATA
+from util.db_helpers import transaction, IDENTITY_MAP
+from util.errors import StaleRowError, TeamFullError
+
+BATCH_SIZE = CONNECTION_CONFIG["batch_size"]
+
+# errors that fail a single operation record; anything else stops the run
+# (the date validator raises RuntimeError for a malformed date, and
+# TeamFullError and StaleRowError are RuntimeErrors too)
+RECORD_ERRORS = (
+    ValueError,
+    NameError,
+    TypeError,
+    RuntimeError,
+    IntegrityError,
+)
+
+
+def require(record: dict, field: str):
+    value = record.get(field)
+    if value is None or value == "":
+        raise ValueError(f"'{field}' is required.")
+    return value
+
+
+def resolve_team(record: dict) -> Team:
+    """
+    Returns the competing team named by the record's 'team_id' or 'team'
+    (name) field. As in the CLI, whose team menu does not list it, the free
+    agent team cannot be the team an operation works on.
+    """
+    if record.get("team_id") is not None:
+        team = Team.get(int(record["team_id"]))
+    else:
+        team = Team.get_by_name(require(record, "team"))
+    if team is None:
+        raise ValueError("Team not found.")
+    if team.is_free_agents:
+        raise ValueError("The free agent team cannot be used for this operation.")
+    return team
+
+
+def resolve_participant(record: dict) -> Participant:
+    participant = Participant.get(int(require(record, "participant_id")))
+    if participant is None:
+        raise ValueError("Participant not found.")
+    return participant
+
+
+def create_team(record: dict, free_team: Team) -> int:
+    team = Team.create(require(record, "name"))
+    try:
+        team.save()
+    except IntegrityError:
+        raise ValueError(TEAM_NAME_TAKEN)
+    return team.id
+
+
+def create_participant(record: dict, free_team: Team) -> int:
+    team = resolve_team(record)
+    participant = Participant(
+        require(record, "f_name"),
+        require(record, "l_name"),
+        require(record, "birth_date"),
+    )
+    team.add_participant(participant)
+    return participant.id
+
+
+def recruit_free_agent(record: dict, free_team: Team) -> int:
+    team = resolve_team(record)
+    participant = resolve_participant(record)
+    if participant.team_id != free_team.id:
+        raise ValueError("Participant is not a free agent.")
+    team.add_participant(participant)
+    return participant.id
+
+
+def remove_participant(record: dict, free_team: Team) -> int:
+    participant = resolve_participant(record)
+    if participant.team_id == free_team.id:
+        raise ValueError("Participant is already a free agent.")
+    if "team_id" in record or "team" in record:
+        if participant.team_id != resolve_team(record).id:
+            raise ValueError("Participant is not on the team.")
+    free_team.add_participant(participant)
+    return participant.id
+
+
+def del_team(record: dict, free_team: Team) -> int:
+    team = resolve_team(record)
+    team.release_participants(free_team)
+    team_id = team.id
+    team.delete()
+    return team_id
+
+
+def del_participant(record: dict, free_team: Team) -> int:
+    participant = resolve_participant(record)
+    participant_id = participant.id
+    participant.delete()
+    return participant_id
+
+
+def upd_participant_f_name(record: dict, free_team: Team) -> int:
+    participant = resolve_participant(record)
+    participant.f_name = require(record, "f_name")
+    return participant.update().id
+
+
+def upd_participant_l_name(record: dict, free_team: Team) -> int:
+    participant = resolve_participant(record)
+    participant.l_name = require(record, "l_name")
+    return participant.update().id
+
+
+def upd_team_name(record: dict, free_team: Team) -> int:
+    team = resolve_team(record)
+    team.name = require(record, "name")
+    try:
+        team.update()
+    except IntegrityError:
+        raise ValueError(TEAM_NAME_TAKEN)
+    return team.id
+
+
+# the batch operation for each operation name in OPS_CONFIG
+BATCH_OPS = {op: globals()[op] for op in OPS_CONFIG if callable(globals().get(op))}
+
+
+def error_message(error: Exception) -> str:
+    if isinstance(error, TeamFullError):
+        return TEAM_FULL
+    if isinstance(error, StaleRowError):
+        return STALE_DATA
+    return str(error)
+
+
+def apply_line(line_number: int, line: str, free_team: Team) -> dict:
+    """
+    Parses one operation record and applies it in its own savepoint, so a
+    failed record rolls back only its own writes. Returns the record's result
+    for the result log.
+    """
+    result = {"line": line_number, "op": None}
+    try:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON: {error}")
+        if not isinstance(record, dict):
+            raise ValueError("The record is not a JSON object.")
+        result["op"] = record.get("op")
+        if result["op"] not in BATCH_OPS:
+            raise ValueError(f"Unknown operation '{result['op']}'.")
+        with transaction():
+            result["id"] = BATCH_OPS[result["op"]](record, free_team)
+        result["status"] = "ok"
+    except RECORD_ERRORS as error:
+        # instances changed by a rolled back record no longer match the
+        # database, so later records load fresh ones
+        IDENTITY_MAP.clear()
+        result["status"] = "error"
+        result["error"] = error_message(error)
+    return result
+
+
+def numbered_lines(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield (line_number, line)
+
+
+def main(
+    ops_file,
+    log_file,
+    batch_size: int = BATCH_SIZE,
+    progress_file=sys.stderr,
+) -> int:
+    """
+    Applies the operation records in ops_file (one JSON object per line, e.g.
+    {"op": "recruit_free_agent", "team": "The Owls", "participant_id": 42})
+    under the same validation and team capacity rules as the CLI. Records
+    are read as a stream and committed batch_size at a time; one JSON result
+    line per record is written to log_file once its batch is committed, so
+    memory use does not grow with the file. Returns the number of failed
+    records.
+    """
+    free_team = Team.fetch_free_agent_team()
+    if free_team is None:
+        raise RuntimeError("The database has no free agent team.")
+
+    records = numbered_lines(ops_file)
+    applied = failed = 0
+    start = time.perf_counter()
+    while batch := list(islice(records, batch_size)):
+        results = []
+        try:
+            with transaction():
+                for line_number, line in batch:
+                    results.append(apply_line(line_number, line, free_team))
+        except BaseException as error:
+            for line_number, _ in batch:
+                log_file.write(
+                    json.dumps(
+                        {
+                            "line": line_number,
+                            "status": "error",
+                            "error": f"Batch rolled back: {error!r}",
+                        }
+                    )
+                    + "\n"
+                )
+            log_file.flush()
+            raise
+        for result in results:
+            log_file.write(json.dumps(result) + "\n")
+            failed += result["status"] == "error"
+        applied += len(results)
+        log_file.flush()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{applied} records, {applied - failed} applied, {failed} failed "
+        f"in {elapsed:.2f} s ({applied / max(elapsed, 1e-9):,.0f} records/s)",
+        file=progress_file,
+    )
+    return failed
@@ -26,12 +26,20 @@ TEAM_FULL = "Team is full. Cannot add participants."
 
 TEAM_EMPTY = "Team is empty. Cannot update, remove, or delete participants."
 
+TEAM_NAME_TAKEN = "Team name already in use. Team names must be unique."
+
+STALE_DATA = "This record was changed by another session. Reloading the latest data."
+
 EXIT_MSG = "Exiting program. Goodbye!"
 
 NONE_SELECTED = "None Selected"
 
 OP_CANCELLED = "Operation cancelled."
 
+FILTER_HINT = (
+    "Type '/' and the start of a name to filter the list ('/' alone clears the filter)."
+)
+
 CANCEL_INSTRUCTION = "<Ctrl + C> to cancel and return to the previous menu"
 
 QUIT_PROMPT = "Are you sure you want to end your session?"
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+SETUP_PATH = str(Path(LIB_PATH, "data", "setup"))
+if SETUP_PATH not in sys.path:
+    sys.path.append(SETUP_PATH)
+
+from __init__ import DB
+from config import PARTICIPANT_MODEL_CONFIG, PARTICIPANT_TABLE_CONFIG
+from models import League, Participant, Team
+from util.db_helpers import IDENTITY_MAP, parse_db_row, select_page
+from util.helpers import fetch_teams
+from validation.enforcers import (
+    compile_regex,
+    enforce_valid_chars,
+    enforce_valid_date,
+)
+from validation.validators import get_validator
+from db_seeder import seed_db, FIRST_NAMES, LAST_NAMES, BIRTH_DATES
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+# every benchmark runs until it has taken MIN_TIME seconds and MIN_SAMPLES
+# samples, but stops after MAX_SAMPLES samples
+MIN_TIME = 1.0
+MIN_SAMPLES = 5
+MAX_SAMPLES = 2000
+
+
+def measure(func: callable, setup: callable = None, batch: int = 1) -> dict:
+    """
+    Times func repeatedly and returns its throughput and latency
+    percentiles. Each sample calls func batch times (for operations too fast
+    to time one by one) and counts as batch operations. setup, if provided,
+    runs untimed before every sample and its return value is passed to func.
+    """
+    latencies = []
+    total = 0.0
+    while len(latencies) < MAX_SAMPLES and (
+        total < MIN_TIME or len(latencies) < MIN_SAMPLES
+    ):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(batch):
+            func(arg)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        latencies.append(elapsed / batch)
+
+    cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "ops": len(latencies) * batch,
+        "ops_per_sec": round(len(latencies) * batch / total, 2),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 3),
+        "p50_us": round(cut_points[49] * 1e6, 3),
+        "p90_us": round(cut_points[89] * 1e6, 3),
+        "p99_us": round(cut_points[98] * 1e6, 3),
+    }
+
+
+def cold(func: callable) -> callable:
+    """
+    Wraps a loading benchmark so that every call starts with an empty
+    identity map and measures the full row hydration.
+    """
+
+    def wrapper(arg):
+        IDENTITY_MAP.clear()
+        return func(arg)
+
+    return wrapper
+
+
+def run_suite(rng: random.Random) -> dict:
+    """
+    Runs every benchmark against the connected (seeded) database and returns
+    {benchmark name: stats}.
+    """
+    teams = Team.fetch()
+    free_team = next(team for team in teams if team.is_free_agents)
+    sample_teams = rng.sample(teams, min(len(teams), 500))
+    team_ids = cycle([team.id for team in sample_teams])
+    updatable_teams = cycle(sample_teams)
+    rows = select_page(PARTICIPANT_TABLE_CONFIG, 1000).items
+    names = cycle(rng.sample(LAST_NAMES, len(LAST_NAMES)))
+    first_names = cycle(FIRST_NAMES)
+    birth_dates = cycle(rng.sample(BIRTH_DATES, 1000))
+
+    def saved_participant(_=None):
+        participant = Participant(
+            next(first_names), next(names), next(birth_dates), free_team.id
+        )
+        participant.save()
+        return participant
+
+    updatable = cycle(Participant.fetch_page(free_team.id, 200).items)
+
+    def renamed_participant():
+        participant = next(updatable)
+        participant.l_name = next(names)
+        return participant
+
+    name_config = PARTICIPANT_MODEL_CONFIG["l_name"]["validation"]
+    date_config = PARTICIPANT_MODEL_CONFIG["birth_date"]["validation"]
+    name_pattern = compile_regex(name_config["regex"])
+    date_pattern = compile_regex(date_config["regex"])
+    l_name_validator = get_validator("participant", "l_name")
+    birth_date_validator = get_validator("participant", "birth_date")
+
+    results = {}
+    results["team_fetch"] = measure(cold(lambda _: Team.fetch()))
+    results["participant_fetch_by_team"] = measure(
+        cold(lambda _: Participant.fetch(next(team_ids)))
+    )
+    results["fetch_teams_first_page"] = measure(cold(lambda _: fetch_teams(15)))
+    results["fetch_teams_prefix"] = measure(
+        cold(lambda _: fetch_teams(15, prefix="the w"))
+    )
+    results["league_load"] = measure(cold(lambda _: League.load()))
+    results["parse_db_row"] = per_row(
+        measure(cold(lambda _: [parse_db_row(Participant, row) for row in rows])),
+        len(rows),
+    )
+    results["participant_save"] = measure(saved_participant)
+    results["participant_update"] = measure(
+        lambda participant: participant.update(), setup=renamed_participant
+    )
+    results["participant_delete"] = measure(
+        lambda participant: participant.delete(), setup=saved_participant
+    )
+    results["team_update"] = measure(
+        lambda team: team.update(), setup=lambda: next(updatable_teams)
+    )
+    results["validate_name_enforcer"] = measure(
+        lambda _: enforce_valid_chars(next(names), name_pattern), batch=1000
+    )
+    results["validate_date_enforcer"] = measure(
+        lambda _: enforce_valid_date(next(birth_dates), date_pattern), batch=1000
+    )
+    results["validate_name_cached"] = measure(
+        lambda _: l_name_validator(next(names)), batch=1000
+    )
+    results["validate_date_cached"] = measure(
+        lambda _: birth_date_validator(next(birth_dates)), batch=1000
+    )
+    return results
+
+
+def per_row(stats: dict, row_count: int) -> dict:
+    """
+    Converts the stats of a benchmark that processes row_count rows per
+    operation into per-row stats.
+    """
+    return {
+        "ops": stats["ops"] * row_count,
+        "ops_per_sec": round(stats["ops_per_sec"] * row_count, 2),
+        **{
+            key: round(value / row_count, 3)
+            for key, value in stats.items()
+            if key.endswith("_us")
+        },
+    }
+
+
+def run_size(label: str, participant_count: int, seed: int) -> dict:
+    """
+    Seeds a fresh temporary database with participant_count participants
+    (four per team on average) and runs the suite against it.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir, "benchmark.db")
+        DB.configure(db_path, "bulk-load")
+        seed_start = time.perf_counter()
+        seed_db(max(participant_count // 4, 5), participant_count, seed)
+        seed_time = time.perf_counter() - seed_start
+
+        DB.configure(db_path, "interactive")
+        IDENTITY_MAP.clear()
+        print(f"running {label} ({participant_count} participants)", file=sys.stderr)
+        results = run_suite(random.Random(seed))
+        DB.close()
+        IDENTITY_MAP.clear()
+    return {
+        "participants": participant_count,
+        "seed_s": round(seed_time, 3),
+        "benchmarks": results,
+    }
+
+
+def compare(report: dict, baseline: dict) -> list:
+    """
+    Compares every benchmark in the report with the same benchmark in the
+    baseline report and returns (size, benchmark, baseline p50, p50, change)
+    rows. The comparison uses median latency, which is less affected by a
+    few slow outliers than throughput; change is the relative speed-up
+    (negative for a slowdown).
+    """
+    rows = []
+    for size, results in report["results"].items():
+        base_results = baseline.get("results", {}).get(size, {})
+        for name, stats in results["benchmarks"].items():
+            base_stats = base_results.get("benchmarks", {}).get(name)
+            if not base_stats:
+                continue
+            change = base_stats["p50_us"] / stats["p50_us"] - 1
+            rows.append((size, name, base_stats["p50_us"], stats["p50_us"], change))
+    return rows
+
+
+def print_comparison(rows: list, threshold: float) -> int:
+    """
+    Prints the comparison rows to stderr and returns the number of
+    regressions, i.e. benchmarks that slowed down by more than threshold.
+    """
+    regressions = 0
+    print(
+        f"{'size':>5} {'benchmark':<28} {'p50 us (baseline -> now)':>34}",
+        file=sys.stderr,
+    )
+    for size, name, base_p50, p50, change in rows:
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{size:>5} {name:<28} {base_p50:>14,.3f} -> {p50:>14,.3f} "
+            f"{change:+8.1%}{flag}",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the persistence and validation hot paths."
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1k,100k,1M",
+        help=f"comma-separated database sizes out of {', '.join(SIZES)} (default: all)",
+    )
+    parser.add_argument("-s", "--seed", type=int, default=1234)
+    parser.add_argument(
+        "-o", "--output", type=Path, help="write the JSON report to this file"
+    )
+    parser.add_argument(
+        "-b", "--baseline", type=Path, help="JSON report to compare the results to"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="median slowdown (as a fraction) reported as a regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": {size: run_size(size, SIZES[size], args.seed) for size in sizes},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = print_comparison(compare(report, baseline), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
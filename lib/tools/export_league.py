@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+
+from __init__ import DB
+from config import PARTICIPANT_TABLE_CONFIG, TEAM_TABLE_CONFIG
+from models import Team
+from util.db_helpers import (
+    iter_rows,
+    select_with_children,
+    transaction,
+    BULK_CHUNK_SIZE,
+)
+
+# bookkeeping columns that are not part of the exported data
+INTERNAL_COLUMNS = ("version",)
+
+EXPORTS = ("teams", "participants", "rosters")
+
+
+def export_columns(table_def: dict) -> tuple:
+    """
+    Returns the (index, name) of every column of the table that is exported.
+    """
+    return tuple(
+        (index, column)
+        for index, column in enumerate(table_def["columns"].keys())
+        if column not in INTERNAL_COLUMNS
+    )
+
+
+def project(row: tuple, columns: tuple) -> tuple:
+    return tuple(row[index] for index, _ in columns)
+
+
+def table_records(table_def: dict, fetch_size: int, **criteria):
+    """
+    Returns the exported column names of the table and a stream of its rows
+    that match the criteria.
+    """
+    columns = export_columns(table_def)
+    rows = iter_rows(table_def, fetch_size, **criteria)
+    return (
+        tuple(name for _, name in columns),
+        (project(row, columns) for row in rows),
+    )
+
+
+def roster_records(fetch_size: int, **criteria):
+    """
+    Returns the column names of the denormalized rosters and a stream of
+    one row per participant, holding the participant's team columns. A team
+    without participants gets one row with empty participant columns.
+    """
+    team_columns = export_columns(TEAM_TABLE_CONFIG)
+    participant_columns = tuple(
+        (index, name)
+        for index, name in export_columns(PARTICIPANT_TABLE_CONFIG)
+        if name != "team_id"
+    )
+    names = tuple(f"team_{name}" for _, name in team_columns) + tuple(
+        f"participant_{name}" if name == "id" else name
+        for _, name in participant_columns
+    )
+    empty_participant = (None,) * len(participant_columns)
+
+    rows = select_with_children(
+        TEAM_TABLE_CONFIG, PARTICIPANT_TABLE_CONFIG, "team_id", fetch_size, **criteria
+    )
+    return (
+        names,
+        (
+            project(team_row, team_columns)
+            + (
+                project(participant_row, participant_columns)
+                if participant_row is not None
+                else empty_participant
+            )
+            for team_row, participant_row in rows
+        ),
+    )
+
+
+def write_csv(output, names: tuple, records) -> int:
+    writer = csv.writer(output)
+    writer.writerow(names)
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def write_jsonl(output, names: tuple, records) -> int:
+    count = 0
+    for record in records:
+        output.write(json.dumps(dict(zip(names, record))) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+@contextmanager
+def open_output(path: Path, compress: bool):
+    """
+    Opens the text stream the export is written to: the file at path, or
+    stdout if path is None, gzip compressed if compress is set.
+    """
+    if path is not None:
+        opener = gzip.open if compress else open
+        with opener(path, "wt", encoding="utf-8", newline="") as output:
+            yield output
+    elif compress:
+        with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as binary:
+            output = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+            yield output
+            # leave stdout open once the gzip stream is finished
+            output.flush()
+            output.detach()
+    else:
+        sys.stdout.reconfigure(newline="")
+        yield sys.stdout
+
+
+def export_league(
+    export: str,
+    output,
+    file_format: str,
+    team: Team = None,
+    free_agents: bool = False,
+    fetch_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """
+    Writes the teams, participants or denormalized rosters (export) to the
+    output stream as CSV or JSONL, limited to one team or to the free agents
+    if requested. Rows are read from the cursor fetch_size at a time and
+    written as they arrive, so memory use does not depend on the league
+    size. Returns the number of rows written.
+    """
+    if export == "participants":
+        criteria = {}
+        if team is not None:
+            criteria["team_id"] = team.id
+        elif free_agents:
+            free_team = Team.fetch_free_agent_team()
+            if free_team is None:
+                raise ValueError("The database has no free agent team.")
+            criteria["team_id"] = free_team.id
+        names, records = table_records(PARTICIPANT_TABLE_CONFIG, fetch_size, **criteria)
+    else:
+        criteria = {}
+        if team is not None:
+            criteria["id"] = team.id
+        elif free_agents:
+            criteria["is_free_agents"] = True
+        if export == "teams":
+            names, records = table_records(TEAM_TABLE_CONFIG, fetch_size, **criteria)
+        else:
+            names, records = roster_records(fetch_size, **criteria)
+    return WRITERS[file_format](output, names, records)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the league's teams, participants or rosters."
+    )
+    parser.add_argument(
+        "export",
+        choices=EXPORTS,
+        help="what to export (rosters: one row per participant with its team)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="output file (default: stdout)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=tuple(WRITERS),
+        default=None,
+        help="output format (default: from the output file extension, else csv)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="gzip the output (implied by an output file ending in .gz)",
+    )
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--team-id", type=int, default=None, help="only this team")
+    scope.add_argument("--team", default=None, help="only the team with this name")
+    scope.add_argument(
+        "--free-agents", action="store_true", help="only the free agent team"
+    )
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=BULK_CHUNK_SIZE,
+        help=f"rows fetched from the database at a time (default: {BULK_CHUNK_SIZE})",
+    )
+    parser.add_argument("--db", type=Path, default=None, help="database file")
+    parser.add_argument(
+        "--profile", default="read-only", help="connection profile (default: read-only)"
+    )
+    args = parser.parse_args()
+
+    suffixes = (
+        [suffix.lower() for suffix in args.output.suffixes] if args.output else []
+    )
+    compress = args.gzip or suffixes[-1:] == [".gz"]
+    if compress and suffixes[-1:] == [".gz"]:
+        suffixes.pop()
+    file_format = args.format or ("jsonl" if suffixes[-1:] == [".jsonl"] else "csv")
+
+    DB.configure(args.db, args.profile)
+    start = time.perf_counter()
+
+    # every query runs in one read transaction, so the export is a
+    # consistent snapshot even while the league is being changed
+    with transaction("DEFERRED"):
+        team = None
+        if args.team_id is not None:
+            team = Team.get(args.team_id)
+        elif args.team is not None:
+            team = Team.get_by_name(args.team)
+        if team is None and (args.team_id is not None or args.team is not None):
+            parser.error("team not found")
+        try:
+            with open_output(args.output, compress) as output:
+                count = export_league(
+                    args.export,
+                    output,
+                    file_format,
+                    team,
+                    args.free_agents,
+                    args.fetch_size,
+                )
+        except BrokenPipeError:
+            # the reader (e.g. head) stopped early; drop the unflushed output
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{count:,} {args.export} rows in {elapsed:.2f} s "
+        f"({count / max(elapsed, 1e-9):,.0f} rows/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
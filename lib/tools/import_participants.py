@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from itertools import dropwhile
+from pathlib import Path
+
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
+
+from __init__ import DB
+from config import (
+    IMPORT_CHECKPOINT_TABLE_CONFIG as CHECKPOINT_CONFIG,
+    PARTICIPANT_TABLE_CONFIG,
+)
+from models import Participant, Team
+from util.db_helpers import (
+    create_table,
+    insert_rows,
+    iter_chunks,
+    select_rows,
+    transaction,
+    upsert_row,
+    BULK_CHUNK_SIZE,
+)
+from validation.validators import get_validator
+
+# the registration fields, validated with the PARTICIPANT_MODEL_CONFIG rules
+IMPORT_COLUMNS = ("f_name", "l_name", "birth_date")
+
+# errors raised by the validators for a value that breaks a rule (the date
+# validator raises RuntimeError for a malformed date)
+VALIDATION_ERRORS = (ValueError, NameError, RuntimeError, TypeError)
+
+
+def read_records(source, file_format: str):
+    """
+    Lazily reads the registrations from an open CSV (with a header row) or
+    JSONL file as (line number, record) pairs, where the line number is the
+    record's first line in the file. Blank lines are skipped. CSV rows are
+    parsed here because quoted fields may span lines; JSONL lines are passed
+    on unparsed and parsed by the validation workers.
+    """
+    if file_format == "jsonl":
+        for line_number, line in enumerate(source, start=1):
+            if line.strip():
+                yield (line_number, line)
+        return
+
+    reader = csv.reader(source)
+    header = next(reader, None)
+    last_line = reader.line_num
+    for row in reader:
+        line_number = last_line + 1
+        last_line = reader.line_num
+        if row:
+            yield (line_number, dict(zip(header, row)))
+
+
+def validate_record(record) -> tuple:
+    """
+    Validates one registration and returns (values, None) for a valid record
+    or (None, reason) for a rejected one.
+    """
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as error:
+            return (None, f"invalid JSON: {error}")
+        if not isinstance(record, dict):
+            return (None, "the record is not a JSON object")
+
+    values = []
+    reasons = []
+    for column in IMPORT_COLUMNS:
+        value = record.get(column)
+        if value is None or value == "":
+            reasons.append(f"{column}: missing")
+            continue
+        try:
+            get_validator("participant", column)(value)
+        except VALIDATION_ERRORS as error:
+            reasons.append(f"{column}: {error}")
+        values.append(value)
+    if reasons:
+        return (None, "; ".join(reasons))
+    return (tuple(values), None)
+
+
+def validate_chunk(chunk: list) -> tuple:
+    """
+    Validates a chunk of (line number, record) pairs in a worker process.
+    Returns (last line number, valid value tuples, rejects) where rejects
+    are (line number, record, reason) tuples.
+    """
+    valid = []
+    rejects = []
+    for line_number, record in chunk:
+        values, reason = validate_record(record)
+        if reason is None:
+            valid.append(values)
+        else:
+            rejects.append((line_number, record, reason))
+    return (chunk[-1][0], valid, rejects)
+
+
+def ignore_interrupts():
+    # Ctrl-C reaches the workers too; the main process stops the import
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def bounded_map(executor, func: callable, chunks, window: int):
+    """
+    Maps func over chunks in the executor's worker processes, keeping at most
+    window chunks in flight so that memory use does not depend on the input
+    size. Results are yielded in input order.
+    """
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # the import stopped early: drop the chunks not yet validated
+        for future in pending:
+            future.cancel()
+
+
+def read_checkpoint(source_key: str) -> int:
+    """
+    Returns the number of lines of the source already imported (committed or
+    rejected) by earlier runs.
+    """
+    rows = select_rows(CHECKPOINT_CONFIG, source=source_key)
+    return rows[0][1] if rows else 0
+
+
+def save_checkpoint(source_key: str, rows_done: int):
+    upsert_row(
+        CHECKPOINT_CONFIG,
+        source=source_key,
+        rows_done=rows_done,
+        updated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+def write_rejects(rejects_file, rejects: list):
+    for line_number, record, reason in rejects:
+        if isinstance(record, str):
+            record = record.rstrip("\n")
+        rejects_file.write(
+            json.dumps({"line": line_number, "record": record, "reason": reason}) + "\n"
+        )
+    rejects_file.flush()
+
+
+def trim_rejects(rejects_path: Path, rows_done: int):
+    """
+    Drops the rejects written after the checkpoint by an interrupted run
+    (the rejects of the chunk it did not commit), which the resumed run
+    writes again.
+    """
+    if not rejects_path.exists():
+        return
+    with open(rejects_path, "r+b") as rejects_file:
+        offset = 0
+        for line in rejects_file:
+            if json.loads(line)["line"] > rows_done:
+                rejects_file.truncate(offset)
+                return
+            offset += len(line)
+
+
+def import_participants(
+    records,
+    source_key: str,
+    team_id: int,
+    rejects_file,
+    rows_done: int = 0,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    workers: int = 0,
+    progress_file=sys.stderr,
+) -> dict:
+    """
+    Imports the (line number, record) pairs in records (after skipping the
+    rows_done lines already imported) as participants of the team with
+    team_id (the free agent team). Chunks of chunk_size records are
+    validated in a pool of worker processes (or in this process if workers
+    is 0). Each chunk's valid rows are bulk inserted in one transaction that also advances the
+    source's checkpoint, so an interrupted import resumes after the last
+    committed chunk. Rejects are written to rejects_file before their chunk
+    commits. Returns the import's stats.
+    """
+    remaining = dropwhile(lambda pair: pair[0] <= rows_done, records)
+    chunks = iter_chunks(remaining, chunk_size)
+    stats = {"rows": 0, "imported": 0, "rejected": 0, "seconds": 0.0}
+    start = last_report = time.perf_counter()
+
+    executor = None
+    if workers > 0:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(workers, initializer=ignore_interrupts)
+        results = bounded_map(executor, validate_chunk, chunks, workers * 2)
+    else:
+        results = map(validate_chunk, chunks)
+
+    try:
+        for last_line, valid, rejects in results:
+            write_rejects(rejects_file, rejects)
+            with transaction():
+                if valid:
+                    insert_rows(
+                        PARTICIPANT_TABLE_CONFIG,
+                        (*IMPORT_COLUMNS, "team_id"),
+                        ((*values, team_id) for values in valid),
+                    )
+                save_checkpoint(source_key, last_line)
+            stats["rows"] += len(valid) + len(rejects)
+            stats["imported"] += len(valid)
+            stats["rejected"] += len(rejects)
+
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                last_report = now
+                print(
+                    f"{last_line:,} lines done, "
+                    f"{stats['rows'] / (now - start):,.0f} rows/s",
+                    file=progress_file,
+                )
+    finally:
+        if executor is not None:
+            results.close()
+            executor.shutdown()
+        stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import participant registrations from a CSV or JSONL file."
+    )
+    parser.add_argument(
+        "source",
+        type=Path,
+        help="CSV file with f_name, l_name and birth_date columns, or JSONL file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        default=None,
+        help="input format (default: from the file extension)",
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        default=None,
+        help="file the rejected rows are written to (default: <source>.rejects.jsonl)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="validation processes, 0 to validate in this process (default: CPU count)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the checkpoint of an earlier run and import from the first row",
+    )
+    parser.add_argument("--db", type=Path, default=None, help="database file")
+    parser.add_argument(
+        "--profile", default=None, help="connection profile (default: interactive)"
+    )
+    args = parser.parse_args()
+
+    file_format = args.format or (
+        "csv" if args.source.suffix.lower() == ".csv" else "jsonl"
+    )
+    rejects_path = args.rejects or Path(f"{args.source}.rejects.jsonl")
+
+    DB.configure(args.db, args.profile)
+    if DB.is_read_only:
+        parser.error("the import needs a writable database")
+    Team.build_table()
+    Participant.build_table()
+    create_table(CHECKPOINT_CONFIG)
+
+    # new registrations join the free agent pool, which has no size limit
+    team = Team.fetch_free_agent_team()
+    if team is None:
+        parser.error("the database has no free agent team")
+
+    source_key = str(args.source.resolve())
+    rows_done = 0 if args.restart else read_checkpoint(source_key)
+    if rows_done:
+        print(f"resuming after line {rows_done:,}", file=sys.stderr)
+        trim_rejects(rejects_path, rows_done)
+
+    try:
+        with open(args.source, newline="", encoding="utf-8") as source, open(
+            rejects_path, "a" if rows_done else "w", encoding="utf-8"
+        ) as rejects_file:
+            stats = import_participants(
+                read_records(source, file_format),
+                source_key,
+                team.id,
+                rejects_file,
+                rows_done,
+                args.chunk_size,
+                args.workers,
+            )
+    except KeyboardInterrupt:
+        rows_done = read_checkpoint(source_key)
+        sys.exit(f"interrupted after line {rows_done:,}; run again to resume")
+
+    print(
+        f"{stats['rows']:,} rows in {stats['seconds']:.2f} s "
+        f"({stats['rows'] / max(stats['seconds'], 1e-9):,.0f} rows/s): "
+        f"{stats['imported']:,} imported into {team.name}, "
+        f"{stats['rejected']:,} rejected"
+        + (f" (see {rejects_path})" if stats["rejected"] else ""),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+LIB_PATH = Path(__file__).resolve().parent.parent
+
+
+def run_once(script: Path, cold_config: bool) -> tuple:
+    """
+    Starts the script with -X importtime and '--help' (which exits once the
+    modules are imported) and returns the wall time in seconds and the
+    {module: (self us, cumulative us)} timings parsed from stderr.
+    """
+    env = dict(os.environ)
+    # the report should reflect normal runs, which use cached bytecode
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if cold_config:
+            env["TRIVIA_CONFIG_SNAPSHOT"] = str(Path(temp_dir, "snapshot"))
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(script), "--help"],
+            cwd=script.parent,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        elapsed = time.perf_counter() - start
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return elapsed, timings
+
+
+def build_report(script: Path, runs: int, cold_config: bool) -> dict:
+    """
+    Runs the script once to warm the bytecode and config caches, then runs
+    it runs more times and returns the median wall time, the median total
+    import time and the median timings of each module.
+    """
+    run_once(script, cold_config)
+    samples = [run_once(script, cold_config) for _ in range(runs)]
+
+    modules = {}
+    for _, timings in samples:
+        for module, timing in timings.items():
+            modules.setdefault(module, []).append(timing)
+
+    return {
+        "wall_ms": statistics.median(elapsed for elapsed, _ in samples) * 1000,
+        "import_ms": statistics.median(
+            sum(self_us for self_us, _ in timings.values()) for _, timings in samples
+        )
+        / 1000,
+        "modules": {
+            module: (
+                statistics.median(t[0] for t in timings) / 1000,
+                statistics.median(t[1] for t in timings) / 1000,
+            )
+            for module, timings in modules.items()
+        },
+    }
+
+
+def print_report(report: dict, top: int, project_only: bool):
+    print(f"start-up (wall): {report['wall_ms']:.1f} ms")
+    print(f"imports (total): {report['import_ms']:.1f} ms\n")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+
+    project_modules = {
+        path.relative_to(LIB_PATH).with_suffix("").as_posix().replace("/", ".")
+        for path in LIB_PATH.rglob("*.py")
+    }
+    project_modules |= {name.rsplit(".", 1)[0] for name in project_modules}
+
+    rows = sorted(report["modules"].items(), key=lambda item: -item[1][1])
+    if project_only:
+        rows = [row for row in rows if row[0] in project_modules]
+    for module, (self_ms, cumulative_ms) in rows[:top]:
+        print(f"{self_ms:9.2f} {cumulative_ms:9.2f}  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report the start-up import times of a CLI script."
+    )
+    parser.add_argument(
+        "script",
+        type=Path,
+        nargs="?",
+        default=LIB_PATH / "cli.py",
+        help="script to measure (default: lib/cli.py)",
+    )
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument("-n", "--top", type=int, default=20)
+    parser.add_argument(
+        "--cold-config",
+        action="store_true",
+        help="parse the JSON config files on every run instead of using the snapshot",
+    )
+    parser.add_argument(
+        "--project-only",
+        action="store_true",
+        help="only list the project's own modules",
+    )
+    args = parser.parse_args()
+
+    report = build_report(args.script.resolve(), args.runs, args.cold_config)
+    print_report(report, args.top, args.project_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import functools
+
+from config import CONNECTION_CONFIG
+
+# worker threads that run database calls for the async model methods; each
+# worker opens its own connection through the connection manager. asyncio and
+# concurrent.futures are only imported once an async method is used, which
+# keeps them out of the CLI's start-up time.
+EXECUTOR_STATE = {"executor": None}
+
+# rows read per query by the async iterators
+ASYNC_PAGE_SIZE = 500
+
+
+def get_executor():
+    """
+    Returns the shared database worker pool (a ThreadPoolExecutor), creating
+    it with 'async_workers' threads from the connection config on first use.
+    """
+    if EXECUTOR_STATE["executor"] is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        EXECUTOR_STATE["executor"] = ThreadPoolExecutor(
+            max_workers=CONNECTION_CONFIG["async_workers"],
+            thread_name_prefix="db-worker",
+        )
+    return EXECUTOR_STATE["executor"]
+
+
+def shutdown_executor(wait: bool = True):
+    """
+    Shuts down the database worker pool. Connections opened by the workers
+    are closed when their threads exit. A new pool is created the next time
+    an async method is awaited.
+    """
+    executor, EXECUTOR_STATE["executor"] = EXECUTOR_STATE["executor"], None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_in_worker(func: callable, *args, **kwargs):
+    """
+    Runs a blocking database call on the worker pool and returns its result
+    without blocking the event loop.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+async def iter_pages(fetch_page: callable, page_size: int, **criteria):
+    """
+    Asynchronously yields every item of a keyset-paginated listing, reading
+    one page of page_size items at a time on the worker pool. fetch_page is
+    a model's fetch_page() method and criteria are its filter arguments.
+    """
+    after = None
+    while True:
+        page = await run_in_worker(fetch_page, limit=page_size, after=after, **criteria)
+        for item in page.items:
+            yield item
+        if not page.has_next:
+            return
+        after = page.items[-1].sort_key()
@@ -1,11 +1,193 @@
-from __init__ import CURSOR, CONN
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from itertools import islice
+from sqlite3 import IntegrityError, OperationalError
+from typing import Iterable
+
+from __init__ import DB
+from classes.identity_map import IdentityMap
+from config import CONNECTION_CONFIG
+from util.errors import StaleRowError
+from util.instrumentation import (
+    INSTRUMENTATION,
+    instrumented_execute,
+    instrumented_executemany,
+)
+
+# rows sent to executemany() per batch by the bulk insert helpers
+BULK_CHUNK_SIZE = 5000
+
+# ids looked up per 'id IN (...)' query, below SQLite's default limit of 999
+# parameters per statement on older versions
+ID_CHUNK_SIZE = 500
+
+# instances loaded during this session, keyed by (model, id)
+IDENTITY_MAP = IdentityMap(weak=True)
+
+# paranoid loading re-validates every row read from the database and records
+# the rows that fail in CORRUPT_ROWS as (model name, id, error message); only
+# the latest ones are kept, while LOAD_STATS counts every failure
+LOAD_SETTINGS = {"paranoid": os.environ.get("TRIVIA_PARANOID_LOAD") == "1"}
+CORRUPT_ROWS = deque(maxlen=10000)
+LOAD_STATS = {"corrupt_rows": 0}
+
+# one page of a keyset-paginated listing and whether pages exist around it
+Page = namedtuple("Page", ("items", "has_prev", "has_next"))
+
+
+class TransactionState(threading.local):
+    """
+    Number of transaction() blocks currently open on the calling thread's
+    connection.
+    """
+
+    depth = 0
+
+
+TRANSACTION_STATE = TransactionState()
+
+# how often and how patiently a statement is retried while another session
+# holds the database lock
+BUSY_RETRY = CONNECTION_CONFIG["busy_retry"]
+
+
+def is_busy_error(error: OperationalError) -> bool:
+    """
+    Returns True if the error was raised because another connection holds a
+    lock on the database.
+    """
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+
+def execute(query: str, params: tuple = ()):
+    """
+    Executes a statement on the connected database, recording it if
+    instrumentation is enabled (see util.instrumentation).
+    """
+    if INSTRUMENTATION["enabled"]:
+        return instrumented_execute(execute_with_retry, query, params)
+    return execute_with_retry(query, params)
+
+
+def executemany(query: str, rows: Iterable):
+    """
+    Executes a statement once for every row on the connected database,
+    recording it if instrumentation is enabled.
+    """
+    if INSTRUMENTATION["enabled"]:
+        return instrumented_executemany(DB.cursor.executemany, query, rows)
+    return DB.cursor.executemany(query, rows)
+
+
+def execute_with_retry(query: str, params: tuple = ()):
+    """
+    Executes a statement on the connected database, retrying it with
+    exponential backoff and jitter while another session holds the lock.
+    Statements inside an open transaction() are not retried because the
+    rest of the transaction would have to be replayed as well, so the error
+    is raised and the block rolls back.
+    """
+    attempts = BUSY_RETRY["attempts"]
+    for attempt in range(attempts + 1):
+        try:
+            return DB.cursor.execute(query, params)
+        except OperationalError as error:
+            if (
+                attempt == attempts
+                or TRANSACTION_STATE.depth > 0
+                or not is_busy_error(error)
+            ):
+                raise
+            delay = BUSY_RETRY["backoff_ms"] * 2**attempt / 1000
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+
+@contextmanager
+def transaction(mode: str = "IMMEDIATE"):
+    """
+    Groups every write made inside the block into one transaction that is
+    committed when the block exits and rolled back if it raises. The helpers
+    in this module defer their commits while a transaction is open. Nested
+    blocks use savepoints, so an error inside an inner block only rolls back
+    the inner block's writes. Model instances changed inside a block that is
+    rolled back are not reverted.
+    """
+    depth = TRANSACTION_STATE.depth
+    savepoint = f"sp_{depth}"
+    execute(f"BEGIN {mode}" if depth == 0 else f"SAVEPOINT {savepoint}")
+    TRANSACTION_STATE.depth = depth + 1
+    try:
+        yield
+    except BaseException:
+        TRANSACTION_STATE.depth = depth
+        if depth == 0:
+            DB.connection.rollback()
+        else:
+            execute(f"ROLLBACK TO {savepoint}")
+            execute(f"RELEASE {savepoint}")
+        raise
+    TRANSACTION_STATE.depth = depth
+    if depth == 0:
+        DB.connection.commit()
+    else:
+        execute(f"RELEASE {savepoint}")
+
+
+def commit():
+    """
+    Commits the connected database unless a transaction() block is open, in
+    which case the block commits when it exits.
+    """
+    if TRANSACTION_STATE.depth == 0:
+        DB.connection.commit()
+
+
+def abandon_write():
+    """
+    Ends the implicit transaction that sqlite3 opened for a failed write
+    made outside a transaction() block, so that the connection does not keep
+    holding the write lock. Inside a block, the block rolls back instead.
+    """
+    if TRANSACTION_STATE.depth == 0:
+        DB.connection.rollback()
+
+
+def execute_write(query: str, params: tuple = ()):
+    """
+    Executes a write statement like execute(), abandoning the write if it
+    breaks a constraint (e.g. a unique index or a foreign key) before the
+    IntegrityError is raised.
+    """
+    try:
+        return execute(query, params)
+    except IntegrityError:
+        abandon_write()
+        raise
+
+
+def stale_row(table_def: dict, id: int):
+    """
+    Raises StaleRowError for a compare-and-swap write that matched no row,
+    abandoning the write first.
+    """
+    abandon_write()
+    raise StaleRowError(
+        f"{table_def['table_name']} row {id} was changed or deleted by another session."
+    )
 
 
 def create_table(table_def: dict):
     """
     Assembles and executes an SQL query that creates a table from data
     in the provided table definition and commits it to the connected
-    database.
+    database. If the table already exists, any declared columns that it is
+    missing are added to it.
     """
     columns = [
         f"{name} {data_type}" for name, data_type in table_def["columns"].items()
@@ -15,8 +197,147 @@ def create_table(table_def: dict):
     col_schema = ", ".join(columns + foreign_keys)
 
     query = f"CREATE TABLE IF NOT EXISTS {table_def['table_name']} ({col_schema})"
-    CURSOR.execute(query)
-    CONN.commit()
+    execute(query)
+    add_missing_columns(table_def)
+    create_indexes(table_def)
+    commit()
+
+
+def add_missing_columns(table_def: dict):
+    """
+    Adds the columns declared in the provided table definition that the live
+    table does not have yet, e.g. the version column for tables created
+    before row versioning. New columns need a default value unless they are
+    nullable.
+    """
+    table_name = table_def["table_name"]
+    live_columns = {
+        row[1] for row in execute(f"PRAGMA table_info({table_name})").fetchall()
+    }
+    for name, data_type in table_def["columns"].items():
+        if name not in live_columns:
+            execute(f"ALTER TABLE {table_name} ADD COLUMN {name} {data_type}")
+
+
+def select_columns(table_def: dict) -> str:
+    """
+    Returns the table's declared columns as a comma-separated list so that
+    rows are always read in declaration order, whatever order the columns
+    were added to the live table in.
+    """
+    return ", ".join(table_def["columns"].keys())
+
+
+def column_name(column) -> str:
+    """
+    Returns the name of a column spec from a table definition, which is
+    either a plain column name or a dict with a 'column' name and an
+    optional 'collate' sequence.
+    """
+    return column if isinstance(column, str) else column["column"]
+
+
+def column_collation(column) -> str:
+    """
+    Returns the ' COLLATE <sequence>' suffix for a column spec or an empty
+    string if it uses the default collation.
+    """
+    if isinstance(column, str) or not column.get("collate"):
+        return ""
+    return f" COLLATE {column['collate']}"
+
+
+def column_expression(column) -> str:
+    """
+    Renders a column spec as SQL, e.g. 'l_name COLLATE NOCASE'.
+    """
+    return f"{column_name(column)}{column_collation(column)}"
+
+
+def index_statement(table_name: str, index_def: dict) -> str:
+    """
+    Assembles the SQL statement that creates the index described by the
+    provided index definition. Index columns are column specs (see
+    column_name()).
+    """
+    columns = ", ".join(column_expression(col) for col in index_def["columns"])
+    unique = "UNIQUE " if index_def.get("unique") else ""
+    return (
+        f"CREATE {unique}INDEX IF NOT EXISTS {index_def['name']} "
+        f"ON {table_name} ({columns})"
+    )
+
+
+def create_indexes(table_def: dict):
+    """
+    Creates every index and unique constraint declared in the 'indexes'
+    list of the provided table definition that does not already exist,
+    drops the retired indexes listed in 'dropped_indexes' and commits the
+    change to the connected database.
+    """
+    for index_name in table_def.get("dropped_indexes", []):
+        execute(f"DROP INDEX IF EXISTS {index_name}")
+    for index_def in table_def.get("indexes", []):
+        try:
+            execute(index_statement(table_def["table_name"], index_def))
+        except IntegrityError:
+            # existing rows break the unique index: leave it out (so the
+            # database still opens) and say which values must be fixed
+            duplicates = ", ".join(
+                f"{value!r} ({count} rows)"
+                for value, count in duplicate_values(table_def, index_def)
+            )
+            print(
+                f"Index {index_def['name']} was not created because "
+                f"{table_def['table_name']} has duplicate values: {duplicates}. "
+                f"Make them unique and run db_initializer.py --sync.",
+                file=sys.stderr,
+            )
+    commit()
+
+
+def duplicate_values(table_def: dict, index_def: dict, limit: int = 10) -> list:
+    """
+    Returns up to limit (value, row count) pairs of the values that more than
+    one row of the table has in the columns of the provided unique index
+    definition. Values of multi-column indexes are tuples.
+    """
+    columns = ", ".join(column_expression(col) for col in index_def["columns"])
+    query = (
+        f"SELECT {columns}, COUNT(*) FROM {table_def['table_name']} "
+        f"GROUP BY {columns} HAVING COUNT(*) > 1 ORDER BY {columns} LIMIT ?"
+    )
+    return [
+        (row[0] if len(row) == 2 else row[:-1], row[-1])
+        for row in execute(query, (limit,)).fetchall()
+    ]
+
+
+def drop_indexes(table_def: dict):
+    """
+    Drops every index declared in the provided table definition, e.g. so
+    that a bulk load can build them once after the rows are written.
+    """
+    for index_def in table_def.get("indexes", []):
+        execute(f"DROP INDEX IF EXISTS {index_def['name']}")
+    commit()
+
+
+def missing_indexes(table_def: dict) -> list:
+    """
+    Compares the indexes declared in the provided table definition with the
+    indexes that exist on the live table and returns the names of any that
+    are declared but missing.
+    """
+    live_indexes = {
+        row[1]
+        for row in execute(f"PRAGMA index_list({table_def['table_name']})").fetchall()
+    }
+    return [
+        index_def["name"]
+        for index_def in table_def.get("indexes", [])
+        if index_def["name"] not in live_indexes
+    ]
 
 
 def drop_table(table_def: dict):
@@ -26,8 +347,8 @@ def drop_table(table_def: dict):
     connected database.
     """
     query = f"DROP TABLE IF EXISTS {table_def['table_name']}"
-    CURSOR.execute(query)
-    CONN.commit()
+    execute(query)
+    commit()
 
 
 def select_all_rows(table_def: dict, team_id: int = None):
@@ -44,22 +365,337 @@ def select_all_rows(table_def: dict, team_id: int = None):
         where_clause = ""
         criteria = ""
 
-    sort_columns = "name" if table_def["table_name"] == "teams" else "l_name, f_name"
+    sort_columns = ", ".join(column_expression(c) for c in table_def["sort_columns"])
     sort_clause = f"ORDER BY {sort_columns}"
-    query = f"SELECT * FROM {table_def['table_name']} {where_clause} {sort_clause}"
+    query = (
+        f"SELECT {select_columns(table_def)} FROM {table_def['table_name']} "
+        f"{where_clause} {sort_clause}"
+    )
+
+    return execute(query, criteria).fetchall()
+
+
+def select_rows_by_ids(table_def: dict, ids: Iterable, chunk_size: int = ID_CHUNK_SIZE):
+    """
+    Lazily fetches the rows of the table specified in the provided table
+    definition whose primary key is in ids, using one 'id IN (...)' query
+    per chunk of ids. Rows come back in id order within each chunk; ids
+    without a row are skipped.
+    """
+    table_name = table_def["table_name"]
+    columns = select_columns(table_def)
+    for chunk in iter_chunks(ids, chunk_size):
+        wildcards = ", ".join(["?"] * len(chunk))
+        query = f"SELECT {columns} FROM {table_name} WHERE id IN ({wildcards})"
+        yield from execute(query, tuple(chunk)).fetchall()
+
 
-    return CURSOR.execute(query, criteria).fetchall()
+def get_instances(model: type, table_def: dict, ids: Iterable) -> dict:
+    """
+    Returns {id: instance} for the provided ids, in the order the ids were
+    first provided. Instances already in the identity map are returned
+    without a query; the others are loaded with select_rows_by_ids(). Ids
+    that are None or have no row are left out.
+    """
+    wanted = [id for id in dict.fromkeys(ids) if id is not None]
+    found = {}
+    missing = []
+    for id in wanted:
+        if (item := IDENTITY_MAP.get(model, id)) is not None:
+            found[id] = item
+        else:
+            missing.append(id)
+    for row in select_rows_by_ids(table_def, missing):
+        found[row[0]] = parse_db_row(model, row)
+    return {id: found[id] for id in wanted if id in found}
+
+
+def iter_cursor(cursor, fetch_size: int = BULK_CHUNK_SIZE):
+    """
+    Lazily yields the rows of an executed query, fetching fetch_size of them
+    at a time so that only one chunk is held in memory.
+    """
+    while rows := cursor.fetchmany(fetch_size):
+        yield from rows
+
+
+def select_with_children(
+    table_def: dict,
+    child_def: dict,
+    foreign_key: str,
+    fetch_size: int = BULK_CHUNK_SIZE,
+    **criteria,
+):
+    """
+    Lazily fetches every row of the table specified in the provided table
+    definition together with its rows in the child table (child_def) whose
+    foreign_key column refers to it, using one LEFT JOIN query ordered by
+    the table's sort columns and then the child table's sort columns. Both
+    orders are read from indexes, so rows stream without a sort and only
+    fetch_size of them are held at a time. Yields (row, child row) tuples,
+    with None as the child row of a row without children. Only rows of the
+    table that match the provided column/value criteria are fetched. The
+    rows are read from the connection's shared cursor, so no other statement
+    can run on the connection until they have all been consumed.
+    """
+    width = len(table_def["columns"])
+    columns = ", ".join(
+        [f"t.{col}" for col in table_def["columns"].keys()]
+        + [f"c.{col}" for col in child_def["columns"].keys()]
+    )
+    conditions = " AND ".join(f"t.{col} = ?" for col in criteria.keys())
+    where_clause = f"WHERE {conditions} " if criteria else ""
+    query = (
+        f"SELECT {columns} FROM {table_def['table_name']} AS t "
+        f"LEFT JOIN {child_def['table_name']} AS c ON c.{foreign_key} = t.id "
+        f"{where_clause}ORDER BY {sort_clause(table_def, alias='t')}, "
+        f"{sort_clause(child_def, alias='c')}"
+    )
+    for row in iter_cursor(execute(query, tuple(criteria.values())), fetch_size):
+        child_row = row[width:]
+        yield (row[:width], child_row if child_row[0] is not None else None)
+
+
+def select_row_by_search_value(table_def: dict, value: str):
+    """
+    Returns the first row, in sort order, whose search column equals value
+    under the column's collation (e.g. a team name, ignoring case), or None.
+    """
+    search_expression = column_expression(table_def["search_column"])
+    query = (
+        f"SELECT {select_columns(table_def)} FROM {table_def['table_name']} "
+        f"WHERE {search_expression} = ? ORDER BY {sort_clause(table_def)} LIMIT 1"
+    )
+    return execute(query, (value,)).fetchone()
+
+
+def rows_query(table_def: dict, criteria: dict) -> tuple:
+    """
+    Returns the (query, params) that select the rows of the table specified
+    in the provided table definition that match the provided column/value
+    criteria, in sort order.
+    """
+    conditions = " AND ".join(f"{col} = ?" for col in criteria.keys())
+    where_clause = f"WHERE {conditions}" if criteria else ""
+    query = (
+        f"SELECT {select_columns(table_def)} FROM {table_def['table_name']} "
+        f"{where_clause} ORDER BY {sort_clause(table_def)}"
+    )
+    return (query, tuple(criteria.values()))
+
+
+def select_rows(table_def: dict, **criteria) -> list:
+    """
+    Returns the rows of the table specified in the provided table definition
+    that match the provided column/value criteria, in sort order.
+    """
+    return execute(*rows_query(table_def, criteria)).fetchall()
+
+
+def iter_rows(table_def: dict, fetch_size: int = BULK_CHUNK_SIZE, **criteria):
+    """
+    Lazily fetches the rows that select_rows() returns, fetch_size at a
+    time, so that memory use does not depend on the table size. Like
+    select_with_children(), it reads from the shared cursor, so the rows
+    must all be consumed before another statement runs.
+    """
+    yield from iter_cursor(execute(*rows_query(table_def, criteria)), fetch_size)
+
+
+def prefix_bounds(prefix: str) -> tuple:
+    """
+    Returns the (lower, upper) bounds of the case-insensitive range of
+    strings that start with prefix, for use in an index range search.
+    """
+    lower = prefix.lower()
+    return (lower, lower[:-1] + chr(ord(lower[-1]) + 1))
+
+
+def page_query(
+    table_def: dict,
+    after: tuple = None,
+    before: tuple = None,
+    prefix: str = None,
+    **criteria,
+) -> tuple:
+    """
+    Assembles the keyset-paginated query used by select_page(). Returns the
+    query (which ends with a 'LIMIT ?' wildcard), its parameters without the
+    limit and the direction ('ASC' or 'DESC') the rows are read in.
+    """
+    sort_columns = table_def["sort_columns"]
+    conditions = [f"{col} = ?" for col in criteria.keys()]
+    params = list(criteria.values())
+
+    if prefix:
+        search_column = table_def["search_column"]
+        search_expression = column_expression(search_column)
+        conditions.append(f"{search_expression} >= ? AND {search_expression} < ?")
+        params.extend(prefix_bounds(prefix))
+
+    if after is not None or before is not None:
+        # collations go on the right-hand side so the row value comparison
+        # can seek the index
+        key_columns = ", ".join(column_name(col) for col in sort_columns)
+        key_wildcards = ", ".join(f"?{column_collation(col)}" for col in sort_columns)
+        operator = ">" if after is not None else "<"
+        conditions.append(f"({key_columns}) {operator} ({key_wildcards})")
+        params.extend(after if after is not None else before)
+
+    direction = "DESC" if before is not None and after is None else "ASC"
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT {select_columns(table_def)} FROM {table_def['table_name']} "
+        f"{where_clause} ORDER BY {sort_clause(table_def, direction)} LIMIT ?"
+    )
+    return (query, params, direction)
+
+
+def sort_clause(table_def: dict, direction: str = "ASC", alias: str = "") -> str:
+    """
+    Renders the table's sort columns as an ORDER BY list, optionally
+    qualified with a table alias.
+    """
+    qualifier = f"{alias}." if alias else ""
+    return ", ".join(
+        f"{qualifier}{column_expression(col)} {direction}"
+        for col in table_def["sort_columns"]
+    )
+
+
+def page_from_rows(rows: list, limit: int, after: tuple, direction: str) -> Page:
+    """
+    Turns the (at most limit + 1) rows read by a page query into a Page in
+    sort order. Returns None when paging back reached the start with a
+    short page, in which case the first full page should be shown instead.
+    """
+    # one extra row reveals whether another page follows in this direction
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if direction == "ASC":
+        return Page(rows, after is not None, has_more)
+    if not has_more and len(rows) < limit:
+        return None
+    rows.reverse()
+    return Page(rows, has_more, True)
+
+
+def select_page(
+    table_def: dict,
+    limit: int,
+    after: tuple = None,
+    before: tuple = None,
+    prefix: str = None,
+    **criteria,
+) -> Page:
+    """
+    Assembles and executes an SQL query that fetches one page of at most
+    limit rows from the table specified in the provided table definition,
+    ordered by the table's sort columns and filtered by the provided
+    column/value criteria and, if provided, by a case-insensitive prefix of
+    the table's search column. Pages are addressed by keyset rather than
+    offset: 'after' or 'before' is the sort key of the last or first row of
+    the page being left, so only the requested page is read no matter how
+    deep into the listing it is. Returns a Page of rows.
+    """
+    query, params, direction = page_query(table_def, after, before, prefix, **criteria)
+    rows = execute(query, (*params, limit + 1)).fetchall()
+    page = page_from_rows(rows, limit, after, direction)
+    if page is None:
+        return select_page(table_def, limit, prefix=prefix, **criteria)
+    return page
 
 
-def del_row(table_def: dict, id: int):
+def select_page_with_counts(
+    table_def: dict,
+    child_def: dict,
+    foreign_key: str,
+    limit: int,
+    after: tuple = None,
+    before: tuple = None,
+    prefix: str = None,
+    extra_criteria: dict = None,
+    **criteria,
+) -> tuple:
+    """
+    Fetches a page like select_page() together with the number of rows of
+    the child table (child_def) whose foreign_key column refers to each row,
+    using a single GROUP BY query. If extra_criteria is provided, the first
+    row matching those column/value criteria is read by the same query,
+    without a count (e.g. the free agent team shown next to a page of
+    competing teams). Returns (Page of (row, count) tuples, extra row or
+    None).
+    """
+    page_sql, params, direction = page_query(
+        table_def, after, before, prefix, **criteria
+    )
+    if extra_criteria is not None:
+        extra_sql, extra_params, _ = page_query(table_def, **extra_criteria)
+        extra_params = (*extra_params, 1)
+    else:
+        extra_sql = (
+            f"SELECT {select_columns(table_def)} FROM {table_def['table_name']} WHERE 0"
+        )
+        extra_params = ()
+
+    # the extra row joins on a NULL key, so its child rows are never read
+    columns = ", ".join(f"t.{col}" for col in table_def["columns"].keys())
+    child_table = child_def["table_name"]
+    query = (
+        f"WITH page AS ({page_sql}), extra AS ({extra_sql}) "
+        f"SELECT {columns}, CASE WHEN t.is_extra THEN NULL ELSE COUNT(c.id) END, "
+        f"t.is_extra FROM (SELECT 1 AS is_extra, NULL AS count_id, * FROM extra "
+        f"UNION ALL SELECT 0, id, * FROM page) AS t "
+        f"LEFT JOIN {child_table} AS c ON c.{foreign_key} = t.count_id "
+        f"GROUP BY t.is_extra, t.id "
+        f"ORDER BY t.is_extra DESC, {sort_clause(table_def, direction, 't')}"
+    )
+    rows = execute(query, (*params, limit + 1, *extra_params)).fetchall()
+
+    extra_row = rows.pop(0)[:-2] if rows and rows[0][-1] else None
+    page = page_from_rows(
+        [(row[:-2], row[-2]) for row in rows], limit, after, direction
+    )
+    if page is None:
+        return select_page_with_counts(
+            table_def,
+            child_def,
+            foreign_key,
+            limit,
+            prefix=prefix,
+            extra_criteria=extra_criteria,
+            **criteria,
+        )
+    return (page, extra_row)
+
+
+def count_rows(table_def: dict, **criteria) -> int:
+    """
+    Returns the number of rows in the table specified in the provided table
+    definition that match the provided column/value criteria.
+    """
+    conditions = " AND ".join(f"{col} = ?" for col in criteria.keys())
+    where_clause = f"WHERE {conditions}" if criteria else ""
+    query = f"SELECT COUNT(*) FROM {table_def['table_name']} {where_clause}"
+    return execute(query, tuple(criteria.values())).fetchone()[0]
+
+
+def del_row(table_def: dict, id: int, version: int = None):
     """
     Assembles and executes an SQL query that deletes the table specified
     in the provided table definition and commits the change to the
-    connected database.
+    connected database. If version is provided, the row is only deleted if
+    it still has that version and StaleRowError is raised if it does not.
     """
     query = f"DELETE FROM {table_def['table_name']} WHERE id = ?"
-    CURSOR.execute(query, (id,))
-    CONN.commit()
+    params = (id,)
+    if version is not None:
+        query += " AND version = ?"
+        params = (id, version)
+    if execute_write(query, params).rowcount == 0 and version is not None:
+        stale_row(table_def, id)
+    commit()
 
 
 def insert_row(table_def: dict, **criteria):
@@ -73,40 +709,204 @@ def insert_row(table_def: dict, **criteria):
     wildcards = ", ".join(["?"] * len(criteria.keys()))
 
     query = f"INSERT INTO {table_def['table_name']} ({columns}) VALUES ({wildcards})"
-    CURSOR.execute(query, tuple(criteria.values()))
-    CONN.commit()
+    execute_write(query, tuple(criteria.values()))
+    commit()
+
+    return DB.cursor.lastrowid
+
+
+def iter_chunks(iterable: Iterable, chunk_size: int = BULK_CHUNK_SIZE):
+    """
+    Lazily splits any iterable (including generators) into lists of at
+    most chunk_size items so that only one chunk is held in memory at a
+    time.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def insert_rows(
+    table_def: dict,
+    columns: tuple,
+    rows: Iterable,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    on_chunk: callable = None,
+) -> range:
+    """
+    Inserts every row (a tuple of values ordered like columns) from the
+    provided iterable into the table specified in the provided table
+    definition using executemany() in chunks, all inside one transaction()
+    that is committed once at the end. The write lock is taken up front so
+    that ids can be assigned sequentially from the current maximum id,
+    which makes the assigned ids a contiguous range that is returned
+    without holding them in memory. If provided, on_chunk is called with
+    each chunk and the range of ids assigned to it. Any error rolls back
+    the whole insert.
+    """
+    table_name = table_def["table_name"]
+    col_string = ", ".join(("id",) + tuple(columns))
+    wildcards = ", ".join(["?"] * (len(columns) + 1))
+    query = f"INSERT INTO {table_name} ({col_string}) VALUES ({wildcards})"
+
+    with transaction():
+        first_id = execute(
+            f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table_name}"
+        ).fetchone()[0]
+        next_id = first_id
+        for chunk in iter_chunks(rows, chunk_size):
+            chunk_ids = range(next_id, next_id + len(chunk))
+            executemany(
+                query, ((row_id, *row) for row_id, row in zip(chunk_ids, chunk))
+            )
+            if on_chunk is not None:
+                on_chunk(chunk, chunk_ids)
+            next_id = chunk_ids.stop
+
+    return range(first_id, next_id)
+
+
+def insert_instances(
+    table_def: dict,
+    columns: tuple,
+    instances: Iterable,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> range:
+    """
+    Bulk inserts model instances with insert_rows(), reading the values for
+    the provided columns from the instances' attributes and assigning each
+    instance its new row id as its chunk is written. Returns the range of
+    assigned ids. If the insert fails and is rolled back, ids already
+    assigned to instances from earlier chunks are not valid.
+    """
+    pending = []
+
+    def instance_rows():
+        for instance in instances:
+            pending.append(instance)
+            yield tuple(getattr(instance, col) for col in columns)
+
+    def assign_ids(chunk: list, chunk_ids: range):
+        for instance, row_id in zip(pending, chunk_ids):
+            instance.id = row_id
+            IDENTITY_MAP.add(instance)
+        pending.clear()
 
-    return CURSOR.lastrowid
+    return insert_rows(table_def, columns, instance_rows(), chunk_size, assign_ids)
 
 
-def update_row(table_def: dict, id: int, **updates):
+def upsert_row(table_def: dict, **values):
+    """
+    Inserts a row into the table specified in the provided table definition,
+    replacing the row with the same primary key if there is one, and
+    commits the change to the connected database.
+    """
+    columns = ", ".join(values.keys())
+    wildcards = ", ".join(["?"] * len(values))
+    query = (
+        f"INSERT OR REPLACE INTO {table_def['table_name']} ({columns}) "
+        f"VALUES ({wildcards})"
+    )
+    execute_write(query, tuple(values.values()))
+    commit()
+
+
+def reassign_rows(table_def: dict, column: str, old_value, new_value) -> int:
+    """
+    Sets column to new_value in every row of the table specified in the
+    provided table definition where it is old_value, with one statement, and
+    commits the change to the connected database. The version of every
+    changed row is incremented, so instances loaded before the change are
+    refreshed by the next load and their compare-and-swap writes fail.
+    Returns the number of changed rows.
+    """
+    assignments = f"{column} = ?"
+    if "version" in table_def["columns"]:
+        assignments += ", version = version + 1"
+    query = f"UPDATE {table_def['table_name']} SET {assignments} WHERE {column} = ?"
+    count = execute_write(query, (new_value, old_value)).rowcount
+    commit()
+    return count
+
+
+def update_row(table_def: dict, id: int, version: int = None, **updates):
     """
     Assembles and executes an SQL query that updates the data for a row
     in the table specified in the provided table definition and commits
     the change to the connected database. The query filters the table
     for a row matching the provided ID number and updates the fields in
-    the columns matching the keys in the keyword criteria.
+    the columns matching the keys in the keyword criteria. If version is
+    provided, the update is a compare-and-swap: it only applies if the row
+    still has that version, it increments the row's version and it raises
+    StaleRowError if another session changed or deleted the row first.
     """
-    assignment_string = ", ".join([f"{col} = ?" for col in updates.keys()])
+    assignments = [f"{col} = ?" for col in updates.keys()]
     where_clause = "WHERE id IS NULL" if id is None else "WHERE id = ?"
     assignment_values = [val for val in updates.values()]
 
     if id is not None:
         assignment_values.append(id)
 
+    if version is not None:
+        assignments.append("version = version + 1")
+        where_clause += " AND version = ?"
+        assignment_values.append(version)
+
+    assignment_string = ", ".join(assignments)
     query = f"UPDATE {table_def['table_name']} SET {assignment_string} {where_clause}"
 
-    CURSOR.execute(query, tuple(assignment_values))
-    CONN.commit()
+    result = execute_write(query, tuple(assignment_values))
+    if result.rowcount == 0 and version is not None:
+        stale_row(table_def, id)
+    commit()
 
 
 def parse_db_row(model: type, record: list):
     """
-    Using a record from either the participants or teams table,
-    instantiates new team or participant instance from the record's
-    data and returns it.
+    Using a record from either the participants or teams table, returns the
+    instance already loaded for the record's id in this session or
+    instantiates a new team or participant instance from the record's data,
+    registers it in the identity map and returns it. Rows were validated
+    when they were written, so they are loaded through the model's trusted
+    constructor unless paranoid loading is enabled. Records end with the
+    row's version, and an instance loaded from an older version of the row
+    is refreshed in place.
+    """
+    if (item := IDENTITY_MAP.get(model, record[0])) is not None:
+        if item.version != record[-1]:
+            item.load_trusted_row(*record)
+        return item
+    if LOAD_SETTINGS["paranoid"]:
+        check_db_row(model, record)
+    item = model.from_trusted_row(*record)
+    return IDENTITY_MAP.setdefault(item)
+
+
+def check_db_row(model: type, record: list) -> bool:
+    """
+    Re-validates a database record by running it through the model's
+    validating constructor. Records that fail are added to CORRUPT_ROWS
+    instead of raising so that the rest of the load can continue.
+    """
+    try:
+        model(*record[1:-1])
+        return True
+    except (ValueError, NameError, RuntimeError, TypeError) as error:
+        CORRUPT_ROWS.append((model.__name__, record[0], str(error)))
+        LOAD_STATS["corrupt_rows"] += 1
+        return False
+
+
+def set_paranoid_load(enabled: bool = True):
+    """
+    Turns re-validation of rows read from the database on or off.
+    """
+    LOAD_SETTINGS["paranoid"] = enabled
+
+
+def clear_corrupt_rows():
+    """
+    Forgets the corrupt rows recorded so far and resets their count.
     """
-    field_list = tuple(record[1:])
-    item = model(*field_list)
-    item.id = record[0]
-    return item
+    CORRUPT_ROWS.clear()
+    LOAD_STATS["corrupt_rows"] = 0
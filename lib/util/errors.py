@@ -0,0 +1,13 @@
+class StaleRowError(RuntimeError):
+    """
+    Raised when a row is updated or deleted with a version number that no
+    longer matches the database, i.e. another session changed or deleted
+    the row after it was loaded.
+    """
+
+
+class TeamFullError(RuntimeError):
+    """
+    Raised when a participant is assigned to a team that already has the
+    maximum number of participants.
+    """
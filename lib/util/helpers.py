@@ -1,12 +1,18 @@
-import os
 import sys
+from functools import lru_cache
 from typing import Union
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
+from classes.menu import Menu
+from classes.screen import Screen
 from models import Participant, Team
-from config import TEXT_COLOR_MAP
+from config import NAV_OPS_CONFIG
+from util.styling import tint_string, fmt_participant_name, entity_label
+from util.instrumentation import INSTRUMENTATION, screen_summary
 from strings.display_messages import (
     HIT_ENTER,
     APP_TITLE,
@@ -14,27 +20,66 @@ from strings.display_messages import (
     CANCEL_INSTRUCTION,
     OP_CANCELLED,
     YN_PROMPT,
+    FILTER_HINT,
 )
 
 
-def fetch_teams():
-    all_teams = Team.fetch()
-    comp_teams = list(t for t in all_teams if not t.is_free_agents)
-    free_team = next((t for t in all_teams if t.is_free_agents), None)
-    return (comp_teams, free_team)
+def fetch_teams(page_size: int, cursor: dict = None, prefix: str = None):
+    """
+    Returns a page of competing teams with their participant counts (as
+    TeamCount tuples) and the free agent team, read in a single query.
+    """
+    return Team.fetch_with_counts(page_size, prefix=prefix, **(cursor or {}))
+
+
+def build_nav_options(page: tuple = None, exclude: tuple = ()) -> tuple:
+    """
+    Builds the navigation option tuples (selector, menu text, op, format) from
+    NAV_OPS_CONFIG, leaving out the ops listed in exclude. Paging ops are only
+    included when a page is provided and another page exists in their
+    direction.
+    """
+    return nav_options_for(
+        page is not None and page.has_next,
+        page is not None and page.has_prev,
+        tuple(exclude),
+    )
+
+
+@lru_cache(maxsize=None)
+def nav_options_for(has_next: bool, has_prev: bool, exclude: tuple) -> tuple:
+    # there are only a handful of combinations, so every one is built once
+    paging_available = {"next": has_next, "prev": has_prev}
+    return tuple(
+        (op[0], attrs.get("menu_text"), op, attrs.get("format"))
+        for op, attrs in NAV_OPS_CONFIG.items()
+        if op not in exclude and (not attrs.get("paging") or paging_available.get(op))
+    )
+
+
+# every screen is composed and written through this screen buffer
+SCREEN = Screen()
+
+# lines shown under the title of every screen by the debug options, keyed by
+# the option that set them
+DEBUG_NOTES = {}
 
 
 def clear_cli():
-    os.system("cls" if os.name == "nt" else "clear")
+    SCREEN.clear()
 
 
-def tint_string(color_key: str, text_string: str) -> str:
-    rgb_combo = TEXT_COLOR_MAP[color_key]
-    return f"\x1b[38;2;{rgb_combo}m{text_string}\x1b[0m"
+def fmt_filter_instruction(instruction: str, prefix: str = None) -> str:
+    filter_status = f"Showing names starting with '{prefix}'\n" if prefix else ""
+    return f"{FILTER_HINT}\n{filter_status}\n{instruction}"
 
 
-def fmt_participant_name(first: str, last: str):
-    return f"{last.upper()}, {first}"
+def apply_filter(context: object, filter_key: str, cursor_key: str, prefix: str):
+    """
+    Stores the name prefix typed at a filterable menu (or clears it if empty)
+    and returns the menu to its first page.
+    """
+    context.update(**{filter_key: prefix or None, cursor_key: None})
 
 
 def step_back(context: object):
@@ -44,20 +89,37 @@ def step_back(context: object):
         context.restart()
 
 
+def turn_page(context: object, cursor_key: str, items: list, forward: bool):
+    """
+    Stores the keyset cursor for the page after (or before) the provided page
+    items in the state so that the current step renders that page next.
+    """
+    context.update(
+        **{
+            cursor_key: (
+                {"after": items[-1].sort_key()}
+                if forward
+                else {"before": items[0].sort_key()}
+            )
+        }
+    )
+
+
 def back_to_op_select(
     context: object, team_menu_func: callable, op_menu_func: callable
 ):
-    init_state = context.init_state.copy()
-    op_sel_state = context.init_state.copy()
-    op_sel_state["team"] = context.state["team"]
-    op_sel_state["team_name"] = context.state["team_name"]
-    op_sel_state["team_roster"] = (
-        context.state["team_roster"] if context.state["team_roster"] else []
+    # the new op selection state shares the selected team's values with the
+    # current state
+    op_sel_state = context.init_state.set(
+        team=context.state["team"],
+        team_name=context.state["team_name"],
+        team_roster=context.state["team_roster"] or (),
+        participant_count=context.state["participant_count"],
+        comp_teams=context.state["comp_teams"],
+        free_team=context.state["free_team"],
     )
-    op_sel_state["comp_teams"] = context.state["comp_teams"]
-    op_sel_state["free_team"] = context.state["free_team"]
     context.stack.clear()
-    context.stack.append((team_menu_func, init_state))
+    context.stack.append((team_menu_func, context.init_state))
     context.stack.append((op_menu_func, op_sel_state))
 
 
@@ -77,32 +139,24 @@ def generate_disp_text(
     Takes in a string, a participant, or a team and returns a formatted version of the
     string or the entity name for display in the CLI. Participant names are formatted
     as "LAST, First", while team names and strings receive no positional formatting.
+    Entity labels are cached per entity version (see util.styling).
     """
-    arg_type_map = {
-        "participant": lambda: tint_string(
-            color_key,
-            fmt_participant_name(str_or_entity.f_name, str_or_entity.l_name),
-        ),
-        "team": lambda: tint_string(color_key, str_or_entity.name),
-        "str": lambda: tint_string(color_key, str_or_entity),
-    }
-    arg_type = type(str_or_entity).__name__.lower()
-    return (
-        arg_type_map.get(arg_type)()
-        if arg_type in arg_type_map.keys()
-        else NONE_SELECTED
-    )
+    if isinstance(str_or_entity, str):
+        return tint_string(color_key, str_or_entity)
+    if isinstance(str_or_entity, (Participant, Team)):
+        return entity_label(str_or_entity, color_key)
+    return NONE_SELECTED
 
 
 def get_input_with_prompt(prompt_text: str, tint_decription: str = "ask") -> str:
-    response = input(generate_disp_text(f"\n{prompt_text}", tint_decription))
+    response = SCREEN.input(generate_disp_text(f"\n{prompt_text}", tint_decription))
     return response
 
 
 def get_user_confirmation(prompt: str) -> bool:
     from util.warnings import warn_invalid_selection
 
-    print(f"{prompt}\n")
+    SCREEN.write_line(f"{prompt}\n")
     exit_loop = False
     while not exit_loop:
         response = get_input_with_prompt(YN_PROMPT, "warn").lower()
@@ -114,26 +168,26 @@ def get_user_confirmation(prompt: str) -> bool:
             warn_invalid_selection()
 
 
-def render_menu(menu_options: tuple, nav_options: tuple):
+def render_menu(menu: Menu):
     """
-    Concatenates the provided option collections into a list with an empty string
-    separating the menu options for the nav options. Prints all options formatted
-    with selectors (op[0]) preceding option descriptions (op[1]), leaving a blank
-    line (empty string) between the option types with the help of the empty string.
+    Adds the menu's options to the screen, formatted with selectors (op[0])
+    preceding option descriptions (op[1]) and a blank line between the menu
+    options and the nav options, then renders the screen. The formatted lines
+    are kept on the menu so that a reused menu is only formatted once.
     """
-    fmt_menu_options = ((option[0], option[1], "menu") for option in menu_options)
-    fmt_nav_options = (
-        (option[0].upper(), option[1], option[3]) for option in nav_options
-    )
-
-    all_options = list(fmt_menu_options) + [""] + list(fmt_nav_options)
-
-    for op in all_options:
-        print(
-            op
-            if isinstance(op, str)
-            else generate_disp_text(f"{op[0]:>2} {op[1]}", op[2])
+    if menu.lines is None:
+        fmt_menu_options = (
+            generate_disp_text(f"{option[0]:>2} {option[1]}", "menu")
+            for option in menu.menu_options
         )
+        fmt_nav_options = (
+            generate_disp_text(f"{option[0].upper():>2} {option[1]}", option[3])
+            for option in menu.nav_options
+        )
+        menu.lines = (*fmt_menu_options, "", *fmt_nav_options)
+
+    SCREEN.add(*menu.lines)
+    SCREEN.render()
 
 
 def render_header(
@@ -145,37 +199,44 @@ def render_header(
     ctrl_c_cancel: bool = True,
 ) -> None:
     def draw_table_line():
-        print(f"{generate_disp_text('-' * 50, 'prompt')}")
+        SCREEN.add(f"{generate_disp_text('-' * 50, 'prompt')}")
 
-    clear_cli()
+    SCREEN.start_frame()
 
     # render the page title with the operation name as a suffix to the app name
     title_text = f"*** {APP_TITLE.upper()} - {operation_name.upper()} ***"
-    print(generate_disp_text(title_text, "title"))
-    print(f"{generate_disp_text('=' * len(title_text), 'title')}\n")
+    SCREEN.add(generate_disp_text(title_text, "title"))
+    SCREEN.add(f"{generate_disp_text('=' * len(title_text), 'title')}\n")
+
+    # SQL debug mode shows the statements run by the previous screen
+    if INSTRUMENTATION["enabled"]:
+        sql_summary = f"SQL on the previous screen: {screen_summary()}"
+        SCREEN.add(f"{generate_disp_text(sql_summary, 'reset')}\n")
+    for note in DEBUG_NOTES.values():
+        SCREEN.add(f"{generate_disp_text(note, 'reset')}\n")
 
     # conditionally render header components if they're needed
     if ctrl_c_cancel:
-        print(f"{generate_disp_text(CANCEL_INSTRUCTION, 'reset')}\n\n")
+        SCREEN.add(f"{generate_disp_text(CANCEL_INSTRUCTION, 'reset')}\n\n")
     if participant_name or team_name:
-        print(f"{generate_disp_text('CURRENTLY SELECTED', 'prompt')}")
+        SCREEN.add(f"{generate_disp_text('CURRENTLY SELECTED', 'prompt')}")
         draw_table_line()
     if participant_name:
-        print(f"{generate_disp_text('Participant:', 'prompt')} {participant_name}")
+        SCREEN.add(f"{generate_disp_text('Participant:', 'prompt')} {participant_name}")
         draw_table_line()
     if team_name:
-        print(f"{generate_disp_text('Team:', 'prompt')} {team_name}")
+        SCREEN.add(f"{generate_disp_text('Team:', 'prompt')} {team_name}")
         draw_table_line()
     if team_name and team_roster is not None:
-        print(f"{generate_disp_text('Team Roster:', 'prompt')}")
+        SCREEN.add(f"{generate_disp_text('Team Roster:', 'prompt')}")
         if len(team_roster):
             for p in team_roster:
-                print(f"{generate_disp_text(p):>20}")
+                SCREEN.add(f"{generate_disp_text(p):>20}")
         else:
-            print(generate_disp_text("** Team Empty **", "warn"))
+            SCREEN.add(generate_disp_text("** Team Empty **", "warn"))
         draw_table_line()
     if instruction:
-        print(f"\n{generate_disp_text(instruction, 'plain')}\n")
+        SCREEN.add(f"\n{generate_disp_text(instruction, 'plain')}\n")
 
 
 def render_result(success_msg: str, is_confirmed: bool = True):
@@ -183,14 +244,14 @@ def render_result(success_msg: str, is_confirmed: bool = True):
     Renders a standardized success message for a specified entity and operation
     and prompts the user to continue.
     """
-    print(f"\n\n{success_msg if is_confirmed else OP_CANCELLED}\n\n")
-    input(generate_disp_text(HIT_ENTER, "plain"))
+    SCREEN.write_line(f"\n\n{success_msg if is_confirmed else OP_CANCELLED}\n\n")
+    SCREEN.input(generate_disp_text(HIT_ENTER, "plain"))
 
 
 def render_warning(warning_msg: str, enter_to_continue: bool = False):
     """
     Generates standardized warning messages to user in "warn" yellow from provided text.
     """
-    print(f"\n{generate_disp_text(warning_msg, 'warn')}\n\n")
+    SCREEN.write_line(f"\n{generate_disp_text(warning_msg, 'warn')}\n\n")
     if enter_to_continue:
-        input(generate_disp_text(HIT_ENTER, "plain"))
+        SCREEN.input(generate_disp_text(HIT_ENTER, "plain"))
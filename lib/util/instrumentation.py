@@ -0,0 +1,284 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+from __init__ import DB
+from config import CONNECTION_CONFIG
+
+MODELS_PATH = str(Path(__file__).resolve().parent.parent / "models")
+LIB_PATH = Path(__file__).resolve().parent.parent
+
+# instrumentation is off unless turned on by the config, $TRIVIA_SQL_DEBUG or
+# set_instrumentation(); statements run uninstrumented while it is off
+INSTRUMENTATION = {
+    **CONNECTION_CONFIG["instrumentation"],
+    "enabled": CONNECTION_CONFIG["instrumentation"]["enabled"]
+    or os.environ.get("TRIVIA_SQL_DEBUG") == "1",
+}
+
+# the most recent statements and the query plan checks, keyed by statement
+QUERY_LOG = deque(maxlen=1000)
+PLAN_CACHE = {}
+
+# statements run during the current and the previous CLI screen
+SCREEN_STATS = {"current": Counter(), "previous": Counter()}
+
+PENDING = threading.local()
+
+
+class QueryRecord:
+    """
+    One executed statement: its text and parameters, the rows it returned
+    (or changed), the time spent executing it and fetching its rows, the
+    model method that ran it and the full-table scans in its query plan.
+    """
+
+    __slots__ = (
+        "statement",
+        "params",
+        "rows",
+        "elapsed",
+        "caller",
+        "scans",
+        "finished",
+    )
+
+    def __init__(self, statement: str, params: tuple, caller: str, scans: tuple):
+        self.statement = statement
+        self.params = params
+        self.rows = 0
+        self.elapsed = 0.0
+        self.caller = caller
+        self.scans = scans
+        self.finished = False
+
+    def __repr__(self):
+        return (
+            f"<<QUERY: {self.caller} {self.elapsed * 1000:.3f} ms, "
+            f"{self.rows} row(s): {self.statement}>>"
+        )
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed * 1000
+
+    def finish(self):
+        """
+        Marks the statement as done once its rows have been fetched (or when
+        the next statement starts), adds its time to the screen stats and
+        logs it if it was slow.
+        """
+        if self.finished:
+            return
+        self.finished = True
+        SCREEN_STATS["current"]["elapsed_ms"] += self.elapsed_ms
+        if self.elapsed_ms >= INSTRUMENTATION["slow_query_ms"]:
+            SCREEN_STATS["current"]["slow"] += 1
+            log_slow_query(self)
+
+
+class InstrumentedCursor:
+    """
+    Wraps the cursor returned for a statement to count the rows fetched from
+    it and time the fetches, which is when SQLite does most of the work for a
+    query. Everything else is delegated to the cursor.
+    """
+
+    def __init__(self, cursor, record: QueryRecord):
+        self._cursor = cursor
+        self.record = record
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while (row := self.fetchone()) is not None:
+            yield row
+
+    def _timed(self, fetch: callable, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        self.record.elapsed += time.perf_counter() - start
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self.record.finish()
+        else:
+            self.record.rows += 1
+        return row
+
+    def fetchmany(self, size: int = None):
+        size = self._cursor.arraysize if size is None else size
+        rows = self._timed(self._cursor.fetchmany, size)
+        self.record.rows += len(rows)
+        if len(rows) < size:
+            self.record.finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self.record.rows += len(rows)
+        self.record.finish()
+        return rows
+
+
+def set_instrumentation(
+    enabled: bool = True, explain: bool = None, slow_query_ms: float = None
+):
+    """
+    Turns statement instrumentation on or off and optionally changes whether
+    query plans are checked and the slow query threshold.
+    """
+    INSTRUMENTATION["enabled"] = enabled
+    if explain is not None:
+        INSTRUMENTATION["explain"] = explain
+    if slow_query_ms is not None:
+        INSTRUMENTATION["slow_query_ms"] = slow_query_ms
+
+
+def find_caller() -> str:
+    """
+    Returns the model method (e.g. 'Participant.fetch') that ran the
+    statement being recorded or, for statements not run by a model, the
+    first function outside the database helpers.
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(MODELS_PATH):
+            owner = frame.f_locals.get("self", frame.f_locals.get("cls"))
+            if owner is not None:
+                owner_name = (
+                    owner.__name__ if isinstance(owner, type) else type(owner).__name__
+                )
+                return f"{owner_name}.{code.co_name}"
+        elif fallback is None and not code.co_filename.endswith(
+            ("db_helpers.py", "instrumentation.py")
+        ):
+            fallback = f"{Path(code.co_filename).stem}.{code.co_name}"
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+def query_plan_scans(statement: str, params: tuple) -> tuple:
+    """
+    Runs EXPLAIN QUERY PLAN for a SELECT statement (once per distinct
+    statement text) and returns the plan steps that scan a whole table
+    without an index.
+    """
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return ()
+    if statement not in PLAN_CACHE:
+        plan = DB.connection.execute(f"EXPLAIN QUERY PLAN {statement}", params)
+        PLAN_CACHE[statement] = tuple(
+            detail
+            for *_, detail in plan.fetchall()
+            if detail.startswith("SCAN") and " USING " not in detail
+        )
+    return PLAN_CACHE[statement]
+
+
+def log_slow_query(record: QueryRecord):
+    """
+    Appends a slow statement to the slow query log file.
+    """
+    log_path = Path(INSTRUMENTATION["slow_query_log"])
+    if not log_path.is_absolute():
+        log_path = LIB_PATH / log_path
+    timestamp = datetime.now().isoformat(timespec="milliseconds")
+    scans = f" scans={'; '.join(record.scans)}" if record.scans else ""
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        log_file.write(
+            f"{timestamp} {record.elapsed_ms:.3f}ms rows={record.rows} "
+            f"caller={record.caller}{scans} sql={' '.join(record.statement.split())} "
+            f"params={record.params!r}\n"
+        )
+
+
+def instrumented_execute(execute: callable, statement: str, params: tuple = ()):
+    """
+    Runs a statement with the provided execute function and records it.
+    Returns an InstrumentedCursor for statements that return rows.
+    """
+    previous = getattr(PENDING, "record", None)
+    if previous is not None:
+        previous.finish()
+
+    scans = query_plan_scans(statement, params) if INSTRUMENTATION["explain"] else ()
+    record = QueryRecord(statement, params, find_caller(), scans)
+    QUERY_LOG.append(record)
+    counts = SCREEN_STATS["current"]
+    counts["queries"] += 1
+    counts[record.caller] += 1
+    counts["scans"] += bool(scans)
+
+    start = time.perf_counter()
+    try:
+        cursor = execute(statement, params)
+    finally:
+        record.elapsed += time.perf_counter() - start
+        PENDING.record = None
+    if cursor.description is None:
+        record.rows = max(cursor.rowcount, 0)
+        record.finish()
+        return cursor
+    PENDING.record = record
+    return InstrumentedCursor(cursor, record)
+
+
+def instrumented_executemany(executemany: callable, statement: str, rows: list):
+    """
+    Runs and records an executemany() call for one chunk of rows.
+    """
+    record = QueryRecord(statement, (), find_caller(), ())
+    QUERY_LOG.append(record)
+    SCREEN_STATS["current"]["queries"] += 1
+    SCREEN_STATS["current"][record.caller] += 1
+    start = time.perf_counter()
+    try:
+        cursor = executemany(statement, rows)
+    finally:
+        record.elapsed = time.perf_counter() - start
+        record.finish()
+    record.rows = max(cursor.rowcount, 0)
+    return cursor
+
+
+def begin_screen():
+    """
+    Starts counting the statements of a new CLI screen; the counts of the
+    screen that just ended become the 'previous' stats.
+    """
+    previous = getattr(PENDING, "record", None)
+    if previous is not None:
+        previous.finish()
+        PENDING.record = None
+    SCREEN_STATS["previous"] = SCREEN_STATS["current"]
+    SCREEN_STATS["current"] = Counter()
+
+
+def screen_summary(stats: Counter = None) -> str:
+    """
+    Summarizes a screen's statements, e.g. '3 queries, 0.42 ms (Team.fetch_page
+    x2, Participant.fetch_page x1)'.
+    """
+    stats = SCREEN_STATS["previous"] if stats is None else stats
+    callers = ", ".join(
+        f"{caller} x{count}"
+        for caller, count in stats.most_common()
+        if caller not in ("queries", "elapsed_ms", "slow", "scans")
+    )
+    flags = "".join(
+        f", {stats[key]} {label}"
+        for key, label in (("slow", "slow"), ("scans", "with table scans"))
+        if stats[key]
+    )
+    summary = f"{stats['queries']} queries, {stats['elapsed_ms']:.2f} ms{flags}"
+    return f"{summary} ({callers})" if callers else summary
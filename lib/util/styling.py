@@ -0,0 +1,73 @@
+import os
+import sys
+from weakref import WeakKeyDictionary
+
+from config import TEXT_COLOR_MAP
+
+RESET = "\x1b[0m"
+
+# colors are left out when the output is not a terminal or NO_COLOR is set
+# (see https://no-color.org)
+STYLE_SETTINGS = {
+    "color": sys.stdout.isatty() and "NO_COLOR" not in os.environ,
+}
+
+# escape sequence that starts each color in TEXT_COLOR_MAP
+STYLE_PREFIXES = {
+    color_key: f"\x1b[38;2;{rgb_combo}m"
+    for color_key, rgb_combo in TEXT_COLOR_MAP.items()
+}
+
+# styled labels of the loaded entities: (version, {color key: label}); keyed
+# by the instance rather than its id, which SQLite can reuse for a new row
+# once the row holding it is deleted
+LABEL_CACHE = WeakKeyDictionary()
+LABEL_CACHE_SIZE = 10000
+
+
+def set_color(enabled: bool):
+    """
+    Turns colored output on or off and drops the labels styled the other way.
+    """
+    STYLE_SETTINGS["color"] = enabled
+    LABEL_CACHE.clear()
+
+
+def tint_string(color_key: str, text_string: str) -> str:
+    prefix = STYLE_PREFIXES[color_key]
+    if not STYLE_SETTINGS["color"]:
+        return text_string
+    return f"{prefix}{text_string}{RESET}"
+
+
+def fmt_participant_name(first: str, last: str):
+    return f"{last.upper()}, {first}"
+
+
+def entity_label(entity: object, color_key: str) -> str:
+    """
+    Returns the entity's display_name() tinted with color_key. Labels of
+    saved entities are cached until the entity's version changes or one of
+    its name setters calls forget_label().
+    """
+    if entity.id is None:
+        return tint_string(color_key, entity.display_name())
+
+    cached = LABEL_CACHE.get(entity)
+    if cached is None or cached[0] != entity.version:
+        if len(LABEL_CACHE) >= LABEL_CACHE_SIZE:
+            LABEL_CACHE.clear()
+        cached = LABEL_CACHE[entity] = (entity.version, {})
+
+    labels = cached[1]
+    label = labels.get(color_key)
+    if label is None:
+        label = labels[color_key] = tint_string(color_key, entity.display_name())
+    return label
+
+
+def forget_label(entity: object):
+    """
+    Drops the cached labels of an entity whose name changed.
+    """
+    LABEL_CACHE.pop(entity, None)
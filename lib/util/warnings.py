@@ -1,7 +1,9 @@
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
 from util.helpers import render_warning
 from strings.display_messages import (
@@ -13,6 +15,8 @@ from strings.display_messages import (
     INVALID_OPTION,
     TEAM_FULL,
     TEAM_EMPTY,
+    TEAM_NAME_TAKEN,
+    STALE_DATA,
 )
 
 
@@ -36,13 +40,21 @@ def warn_date_invalid():
     render_warning(INVALID_DATE)
 
 
-def warn_team_full():
-    render_warning(TEAM_FULL)
+def warn_team_full(enter_to_continue: bool = False):
+    render_warning(TEAM_FULL, enter_to_continue)
 
 
 def warn_team_empty():
     render_warning(TEAM_EMPTY)
 
 
+def warn_team_name_taken():
+    render_warning(TEAM_NAME_TAKEN, enter_to_continue=True)
+
+
+def warn_stale_data():
+    render_warning(STALE_DATA, enter_to_continue=True)
+
+
 def warn_invalid_option():
     render_warning(INVALID_OPTION, enter_to_continue=True)
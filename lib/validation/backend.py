@@ -1,19 +1,25 @@
 import functools
 
+from validation.validators import get_validator
 
-def validation_config(model_type: str, attr_name: str):
-    from models.participant import Participant
-    from models.team import Team
 
-    if model_type == "participant":
-        attr = Participant.CONFIG.get(attr_name)
-    elif model_type == "team":
-        attr = Team.CONFIG.get(attr_name)
-    else:
-        raise ValueError(
-            f"Unexpteced class type '{model_type}'. Expected 'participant' or 'team."
-        )
-    return attr.get("validation", "Validation type missing")
+def validated_setter(setter: callable, entity_name: str, attr_name: str):
+    """
+    Wraps a setter so that it runs the attribute's validator first. The
+    validator is built on the first call rather than when the model class is
+    defined, which keeps regex compilation out of start-up.
+    """
+    validator = None
+
+    @functools.wraps(setter)
+    def wrapper(self, value):
+        nonlocal validator
+        if validator is None:
+            validator = get_validator(entity_name, attr_name)
+        validator(value)
+        return setter(self, value)
+
+    return wrapper
 
 
 def validate_name(entity_name: str, attr_name: str):
@@ -22,19 +28,7 @@ def validate_name(entity_name: str, attr_name: str):
     """
 
     def decorator(setter):
-        @functools.wraps(setter)
-        def wrapper(self, value):
-            from validation.enforcers import enforce_range
-            from validation.enforcers import enforce_valid_chars
-
-            constraints = validation_config(entity_name, attr_name)
-            enforce_range(
-                len(value), constraints.get("min_length"), constraints.get("max_length")
-            )
-            enforce_valid_chars(value, constraints.get("regex"))
-            return setter(self, value)
-
-        return wrapper
+        return validated_setter(setter, entity_name, attr_name)
 
     return decorator
 
@@ -45,14 +39,6 @@ def validate_date(entity_name: str, attr_name: str):
     """
 
     def decorator(setter):
-        @functools.wraps(setter)
-        def wrapper(self, value):
-            from validation.enforcers import enforce_valid_date
-
-            constraints = validation_config(entity_name, attr_name)
-            enforce_valid_date(value, constraints.get("regex"))
-            return setter(self, value)
-
-        return wrapper
+        return validated_setter(setter, entity_name, attr_name)
 
     return decorator
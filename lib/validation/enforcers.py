@@ -1,7 +1,27 @@
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 import re
 
 
+@lru_cache(maxsize=None)
+def compile_regex(validation_regex: str) -> re.Pattern:
+    """
+    Compiles a validation regex once and returns the cached pattern on every
+    later call.
+    """
+    return re.compile(validation_regex)
+
+
+def as_pattern(validation_regex) -> re.Pattern:
+    """
+    Returns validation_regex unchanged if it is already a compiled pattern or
+    its cached compiled pattern if it is a string.
+    """
+    if isinstance(validation_regex, re.Pattern):
+        return validation_regex
+    return compile_regex(validation_regex)
+
+
 def enforce_range(check_val: int, lower_lim: int, upper_lim: int):
     """
     Validates that check_val is an integer and lies within the inclusive
@@ -16,12 +36,15 @@ def enforce_range(check_val: int, lower_lim: int, upper_lim: int):
         return True
 
 
-def enforce_valid_chars(check_val: str, validation_regex: str):
+def enforce_valid_chars(check_val: str, validation_regex):
     """
     Validates that check_val does not contain any characters that match
-    the supplied regex pattern
+    the supplied regex pattern (a string or a compiled pattern)
     """
-    if invalid_char_set := {char for char in re.sub(validation_regex, "", check_val)}:
+    pattern = as_pattern(validation_regex)
+    if (match := pattern.match(check_val)) and match.end() == len(check_val):
+        return True
+    if invalid_char_set := {char for char in pattern.sub("", check_val)}:
         invalid_char_str = f"' , ".join(invalid_char_set)
         raise NameError(
             f"'{check_val}' contains invalid character(s): " f"'{invalid_char_str}'."
@@ -30,17 +53,19 @@ def enforce_valid_chars(check_val: str, validation_regex: str):
         return True
 
 
-def enforce_valid_date(check_val: str, validation_regex: str):
+def enforce_valid_date(check_val: str, validation_regex):
     """
     Ensures that check_val has valid date formatting (YYYY-MM-DD) and
-    then ensures that the date has a valid date value by attempting to
-    apply the striptime() method of the datetime class.
+    then ensures that the date has a valid date value by building a date
+    from its year, month and day fields.
     """
-    valid_format = re.match(validation_regex, check_val)
+    valid_format = as_pattern(validation_regex).match(check_val)
     if not valid_format:
         raise RuntimeError(f"'{check_val}' format invalid. Expected 'YYYY-MM-DD'.")
     try:
-        datetime.strptime(check_val, "%Y-%m-%d")
+        if len(check_val) != 10:
+            raise ValueError
+        date(int(check_val[:4]), int(check_val[5:7]), int(check_val[8:]))
         return True
     except ValueError:
         raise ValueError(f"'{check_val}' is not a valid date.")
@@ -51,16 +76,3 @@ def enforce_in_list(item: any, *option_list: any) -> bool:
         option_string = " or ".join([f"'{option}'" for option in option_list])
         raise ValueError(f"Invalid item. Got '{item}', expected {option_string}.")
     return True
-
-
-def enforce_free_agent_team_id_1(team: type):
-    team_name = team.name
-    team_id = team.id
-
-    try:
-        assert team_id == 1
-
-    except AssertionError:
-        raise AssertionError(
-            f"Team '{team_name}' has incorrect id. Expected 1, got {team_id}. Database must be re-initialised and re-seeded"
-        )
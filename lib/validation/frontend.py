@@ -1,13 +1,11 @@
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+LIB_PATH = str(Path(__file__).resolve().parent.parent)
+if LIB_PATH not in sys.path:
+    sys.path.append(LIB_PATH)
 
-from validation.enforcers import (
-    enforce_range,
-    enforce_valid_chars,
-    enforce_valid_date,
-)
+from validation.validators import validator_for
 from util.warnings import (
     warn_length_invalid,
     warn_invalid_char,
@@ -17,15 +15,8 @@ from util.warnings import (
 
 
 def validate_name(attr_config: dict, check_val: str):
-
-    range_floor = attr_config["validation"]["min_length"]
-    range_cieling = attr_config["validation"]["max_length"]
-
     try:
-        enforce_range(len(check_val), range_floor, range_cieling)
-        enforce_valid_chars(check_val, attr_config["validation"]["regex"])
-
-        return True
+        return validator_for(attr_config["validation"])(check_val)
 
     except ValueError:
         warn_length_invalid()
@@ -37,8 +28,7 @@ def validate_name(attr_config: dict, check_val: str):
 
 def validate_date(attr_config: dict, check_val: str):
     try:
-        enforce_valid_date(check_val, attr_config["validation"]["regex"])
-        return True
+        return validator_for(attr_config["validation"])(check_val)
 
     except RuntimeError:
         warn_invalid_date_format()
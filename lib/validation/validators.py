@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+from config import PARTICIPANT_MODEL_CONFIG, TEAM_MODEL_CONFIG
+from validation.enforcers import (
+    compile_regex,
+    enforce_range,
+    enforce_valid_chars,
+    enforce_valid_date,
+)
+
+MODEL_CONFIGS = {
+    "participant": PARTICIPANT_MODEL_CONFIG,
+    "team": TEAM_MODEL_CONFIG,
+}
+
+# number of distinct values each validator remembers as already valid
+VALIDATED_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=None)
+def build_validator(
+    validate_as: str, min_length: int, max_length: int, regex: str
+) -> callable:
+    """
+    Builds a validator for one set of constraints with its regex compiled in
+    advance. The validator raises the same errors as the enforcers and
+    remembers the values that passed, so a value that was already validated
+    (e.g. by the CLI before it reaches a model setter) is not checked again.
+    """
+    pattern = compile_regex(regex)
+
+    if validate_as == "name":
+
+        @lru_cache(maxsize=VALIDATED_CACHE_SIZE)
+        def validator(value: str) -> bool:
+            enforce_range(len(value), min_length, max_length)
+            return enforce_valid_chars(value, pattern)
+
+    elif validate_as == "date":
+
+        @lru_cache(maxsize=VALIDATED_CACHE_SIZE)
+        def validator(value: str) -> bool:
+            return enforce_valid_date(value, pattern)
+
+    else:
+        raise ValueError(
+            f"Unexpected validation type '{validate_as}'. Expected 'name' or 'date'."
+        )
+
+    return validator
+
+
+def validator_for(constraints: dict) -> callable:
+    """
+    Returns the shared validator for the provided 'validation' constraints
+    from a model config.
+    """
+    return build_validator(
+        constraints.get("validate_as"),
+        constraints.get("min_length"),
+        constraints.get("max_length"),
+        constraints.get("regex"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_validator(model_type: str, attr_name: str) -> callable:
+    """
+    Returns the validator for a model attribute, built once from the model's
+    config.
+    """
+    if model_type not in MODEL_CONFIGS:
+        raise ValueError(
+            f"Unexpected class type '{model_type}'. Expected 'participant' or 'team'."
+        )
+    return validator_for(MODEL_CONFIGS[model_type][attr_name]["validation"])